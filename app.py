@@ -1,13 +1,25 @@
 import streamlit as st
-import time
 import re
 import random
+import os
+import uuid
 
-from game_multiproc import NumberBaseballGame
+from game import ALPHABETS, NumberBaseballGame, max_level
+import chat_render
+
+
+@st.cache_resource
+def start_prewarm():
+    """서버 프로세스당 한 번: 엔진 미리 데우기를 백그라운드로 시작합니다. (첫 화면 렌더링을 막지 않음)"""
+    import prewarm
+    return prewarm.start_background()
 
 
 def main():
     
+    # 배포 직후 첫 게임이 테이블/워커 풀 준비 비용을 치르지 않도록 (NBB_PREWARM_LEVELS로 레벨 설정)
+    start_prewarm()
+    
     # --- 1. 세션 상태 초기화 ---
     def init_session_state():
         default_values = {
@@ -21,6 +33,13 @@ def main():
             'player_action': 'Attack',              #플레이어 모드 액션 (ATk / DFS) 상태 관리
             'manual_input_value': "",               #AUTOPLAY용 정답 입력 창
             'active_mode': None,                    #현재 실행중인 모드 상태
+            'session_id': uuid.uuid4().hex,         #계산 스케줄러에서 세션을 구분하는 ID
+            'chat_view': chat_render.ChatHistoryView(),  #채팅 말풍선 HTML 누적 캐시
+            'show_full_history': False,             #오래된 채팅 기록까지 모두 보기
+            'turbo_settings': {'enabled': False, 'pace': 0.3, 'results_only': False},  #터보 AUTOPLAY 설정
+            'turbo_replay': [],                     #터보 AUTOPLAY: 재생 대기 중인 메시지
+            'evil_host': False,                     #ATTACK 악마 호스트 모드 (정답을 정하지 않음)
+            'alphabet': 'decimal',                  #기호 집합 (game.ALPHABETS의 키: 10진수 / 16진수)
             
             # game_instance는 start_game에서 생성되므로 여기서 None으로 두거나 생략 가능
         }
@@ -120,8 +139,8 @@ def main():
     
     # --- 3. 게임 로직 함수 분리 ---
     
-    def logic_autoplay():
-        """AUTOPLAY 모드 로직"""
+    def logic_autoplay(live_placeholder):
+        """AUTOPLAY 모드 로직 (새 메시지는 live_placeholder 한 곳에 이어 붙여 그립니다)"""
         game = st.session_state.game_instance
         target = st.session_state.manual_input_value
         
@@ -130,41 +149,102 @@ def main():
         should_stop = lambda: st.session_state.page != 'chat'
         
     
+        live_parts = []
         for msg in game.play_game(target, stop_callback=should_stop):
             
             # 루프 도중이라도 사용자가 홈으로 나갔다면 즉시 중단
             if should_stop():
                 break
                 
-            st.session_state.messages.append({"role": "assistant", "content": msg})
+            message = {"role": "assistant", "content": msg}
+            st.session_state.messages.append(message)
             
-            st.markdown(f"""
-            <div class="message-row bot-row">
-                <div class="bot-bubble">{msg}</div>
-            </div>
-            """, unsafe_allow_html=True)
-                
-            time.sleep(0.05)
+            # 이번 실행에서 나온 메시지들만 하나의 요소로 다시 그립니다. (고정 sleep 없음)
+            live_parts.append(chat_render.bubble_html(message))
+            live_placeholder.markdown("\n".join(live_parts), unsafe_allow_html=True)
             
         return
     
+    def logic_autoplay_turbo():
+        """
+        터보 AUTOPLAY 모드 로직: 화면 출력 없이 게임 전체를 먼저 풀고(모든 코어/캐시 사용),
+        결과만 보여주거나 저장된 회차 메시지를 재생 대기열에 넣습니다.
+        """
+        game = st.session_state.game_instance
+        target = st.session_state.manual_input_value
+        settings = st.session_state.turbo_settings
+        should_stop = lambda: st.session_state.page != 'chat'
+        
+        with st.spinner("⚡ 전체 게임을 먼저 계산하고 있습니다..."):
+            try:
+                result = game.solve(target, stop_callback=should_stop)
+            except InterruptedError:
+                return 'GAME_STOPPED'
+        
+        if result["solved"]:
+            summary = f"⚡ 정답! {result['guess_count']}회 만에 맞혔습니다. (계산 {result['seconds']:.2f}초)"
+        else:
+            summary = result["error"] or "AI가 10회 안에 맞히지 못했습니다."
+        
+        if settings['results_only']:
+            st.session_state.messages.append({"role": "assistant", "content": summary})
+            return 'GAME_OVER'
+        
+        st.session_state.turbo_replay = [turn["message"] for turn in result["turns"]] + [summary]
+        return 'AUTOPLAY_REPLAY'
+    
     def logic_player_attack(user_input):
         """PLAYER MODE - ATTACK (사용자가 맞추는 모드)"""
         game = st.session_state.game_instance
         game.guess_count += 1
+        
         # 정답이 없으면(혹시 모를 오류 대비) 재생성
-        if not hasattr(game, 'secret_answer'):
+        if not game.evil_host and not game.secret_answer:
             n = st.session_state.game_level
-            game.secret_answer = "".join(map(str, random.sample(range(10), n)))
+            game.secret_answer = "".join(random.sample(game.DIGITS, n))
+        if game.alive_bitmap is None:
+            game.track_alive()
+        
+        # 판정 전에, 지금 상태에서 이 추측이 얼마나 좋은 질문인지 엔진의 최선 추측과 비교합니다.
+        quality = game.guess_quality(user_input)
         
-        strike, ball = game.check_sb(user_input, game.secret_answer)
+        if game.evil_host:
+            # 악마 호스트: 정답 없이, 가능한 정답이 가장 많이 남는 결과로 대답합니다.
+            strike, ball = game.evil_host_response(user_input)
+        else:
+            strike, ball = game.check_sb(user_input, game.secret_answer)
+            game.narrow_alive(user_input, strike, ball)
         
         if strike == st.session_state.game_level:
             st.session_state.active_mode = 'GAME_OVER'
+            if game.evil_host:
+                return strike, ball, f"😈 더는 피할 수 없네요... {game.guess_count}회 만에 맞혔습니다. 🎉"
             return strike, ball, f"🎉 정답입니다! {game.guess_count}회 만에 맞혔습니다. 🎉"
         
         # 사용자가 입력한 user_input(숫자)에 대해 Strike/Ball 판정
-        return strike, ball, f"입력하신 숫자 '{user_input}'에 대한 판정 결과: {strike}S {ball}B"
+        response = f"입력하신 숫자 '{user_input}'에 대한 판정 결과: {strike}S {ball}B"
+        return strike, ball, response + "\n\n" + attack_analysis_message(quality, game.alive_bitmap.bit_count())
+    
+    def attack_analysis_message(quality, remaining):
+        """ATTACK 추측 분석 메시지 (남은 정답 수 + 엔진 최선 추측과 비교)"""
+        lines = [
+            f"📊 가능한 정답: {quality['alive']}개 → **{remaining}개**",
+            f"이 추측: 최악 {quality['worst']}개 / 평균 {quality['expected']:.1f}개 남음",
+        ]
+        if quality['best_guess'] is None and quality['best_pending']:
+            lines.append("엔진 최선 추측: 계산 중...")
+        elif quality['best_guess'] is None:
+            lines.append("엔진 최선 추측: (서버 메모리 절약을 위해 생략)")
+        elif quality['best_exact']:
+            lines.append(f"엔진 최선 추측 {quality['best_guess']}: "
+                         f"최악 {quality['best_worst']}개 / 평균 {quality['best_expected']:.1f}개 남음")
+        elif quality['worst'] <= quality['best_worst']:
+            # 근사값보다 낫거나 같은 추측은 근사값과 비교해 평가하지 않습니다.
+            lines.append(f"엔진 참고 추측(근사) {quality['best_guess']}보다 나쁘지 않은 추측입니다.")
+        else:
+            lines.append(f"엔진 참고 추측(근사, 최선이 아닐 수 있음) {quality['best_guess']}: "
+                         f"최악 {quality['best_worst']}개 / 평균 {quality['best_expected']:.1f}개 남음")
+        return "\n\n".join(lines)
     
     def logic_player_defense(user_input):
         """PLAYER MODE - DEFENSE (컴퓨터가 맞추는 모드)"""
@@ -193,7 +273,7 @@ def main():
         if not last_guess:
             return "⛔ 오류: 이전 추측 정보가 없습니다. 게임을 재시작해주세요."
             
-        game.candidates = game.filter_candidates(last_guess, strike, ball)
+        game.apply_feedback(last_guess, strike, ball)
         
         if not game.candidates:
             st.session_state.active_mode = 'GAME_OVER'
@@ -239,6 +319,8 @@ def main():
     def go_home():
         st.session_state.page = 'main'
         st.session_state.messages = []
+        st.session_state.chat_view.reset()
+        st.session_state.show_full_history = False
         st.session_state.show_exit_confirm = False
         st.session_state.input_disabled = False
         
@@ -251,6 +333,8 @@ def main():
         st.session_state.show_exit_confirm = False
         st.session_state.input_disabled = False
         st.session_state.messages = [] # 메시지 초기화
+        st.session_state.chat_view.reset()
+        st.session_state.show_full_history = False
         
         # 1. 현재 모드 확정 (active_mode 설정)
         if st.session_state.autoplay_checked:
@@ -262,7 +346,13 @@ def main():
                 st.session_state.active_mode = 'DEFENSE'
         
         current_level = st.session_state.game_level
-        game = NumberBaseballGame(n=current_level)
+        game = NumberBaseballGame(n=current_level, session_id=st.session_state.session_id,
+                                  digits=ALPHABETS[st.session_state.alphabet])
+        # 미리 계산된 전략 트리가 있으면 불러옵니다. (python strategy_tree.py build --level N)
+        import strategy_tree
+        tree_path = strategy_tree.default_tree_path(current_level, game.DIGITS)
+        if os.path.exists(tree_path):
+            game.load_strategy_tree(tree_path)
         st.session_state.game_instance = game
         
         # 3. 모드별 초기화 로직
@@ -278,6 +368,8 @@ def main():
         elif mode == 'DEFENSE':
             # (1) 후보군 전체 생성 (시간이 좀 걸릴 수 있으므로 안내 메시지 고려)
             game.generate_all_candidates()
+            if game.memory_notice():
+                st.session_state.messages.append({"role": "assistant", "content": game.memory_notice()})
             
             # (2) 첫 번째 추측 생성 (예: "0123" 또는 "1234")
             first_guess = game.DIGITS[:current_level]
@@ -291,13 +383,19 @@ def main():
             st.session_state.messages.append({"role": "assistant", "content": first_msg})
         
         # ATTACK 모드일 경우, 여기서 정답을 미리 생성해서 박제합니다.
+        elif mode == 'ATTACK' and st.session_state.evil_host:
+            # 악마 호스트: 정답을 정하지 않고 가능한 정답 전체로 시작합니다.
+            game.start_evil_host()
+            game.guess_count = 1
+        
         elif mode == 'ATTACK':
-            # 0~9 중복 없이 n개 뽑아서 문자열로 변환
-            digits = random.sample(range(10), current_level)
-            secret_number = "".join(map(str, digits))
+            # 기호 집합(기본 0~9)에서 중복 없이 n개 뽑아서 문자열로 변환
+            secret_number = "".join(random.sample(game.DIGITS, current_level))
             
             # 생성된 정답을 게임 객체 안에 저장해둡니다. (이 객체는 홈으로 가기 전까지 유지됨)
             st.session_state.game_instance.secret_answer = secret_number
+            # 추측 분석용: 가능한 정답 집합을 비트맵으로 추적하고 엔진 최선 추측을 미리 계산해 둡니다.
+            game.track_alive()
             
             game.guess_count = 1
             
@@ -371,6 +469,11 @@ def main():
                 ):
                     set_player_action('Defense')
                     st.rerun()
+            
+            # 공격 모드 옵션: 정답을 정하지 않고 끝까지 피해 다니는 호스트
+            if st.session_state.player_action == 'Attack':
+                st.checkbox("😈 악마 호스트 (정답을 정하지 않고 끝까지 피해 다닙니다)", value=st.session_state.evil_host,
+                            key="evil_host_widget")
                     
             st.markdown("<br>", unsafe_allow_html=True) # 간격 추가
     
@@ -383,13 +486,30 @@ def main():
                 key="manual_input_widget",
                 label_visibility="collapsed"
             )
+            
+            # 터보: 먼저 전부 계산한 뒤 정해진 속도로 재생 (또는 결과만)
+            turbo = st.session_state.turbo_settings
+            st.checkbox("⚡ 터보 (먼저 계산하고 재생)", value=turbo['enabled'], key="turbo_enabled_widget")
+            if st.session_state.turbo_enabled_widget:
+                st.slider("재생 간격 (초)", 0.0, 2.0, value=turbo['pace'], step=0.1, key="turbo_pace_widget")
+                st.checkbox("결과만 보기 (추측 횟수와 계산 시간만)", value=turbo['results_only'],
+                            key="turbo_results_only_widget")
             st.markdown("<br>", unsafe_allow_html=True)
         
         
         st.write("난이도(숫자)를 설정하고 시작 버튼을 누르세요.")
+        st.radio("기호", options=list(ALPHABETS), horizontal=True, label_visibility="collapsed",
+                 index=list(ALPHABETS).index(st.session_state.alphabet), key="alphabet_widget",
+                 format_func=lambda name: {"decimal": "10진수 (0~9)", "hex": "16진수 (0~9, A~F)"}.get(name, name))
         
         col_level_1, col_level_2 = st.columns([1, 4]) 
         
+        # 최대 자릿수는 기호 집합과 서버 메모리에 따라 다릅니다. (game.max_level, 메모리가 넉넉하면 10진수 9자리, 16진수 6자리)
+        level_cap = min(9, max_level(ALPHABETS[st.session_state.alphabet_widget]))
+        if st.session_state.game_level > level_cap:
+            st.session_state.game_level = level_cap
+            st.session_state.pop("level_input", None)  # 위젯을 새 최댓값 안의 값으로 다시 만듭니다.
+        
         with col_level_1:
             # - key: "level_input" (위젯 전용 임시 키)
             # - value: st.session_state.game_level (현재 저장된 레벨 값으로 시작)
@@ -397,7 +517,7 @@ def main():
             st.number_input(
                 "Level", 
                 min_value=3, 
-                max_value=9, 
+                max_value=level_cap, 
                 step=1,
                 value=st.session_state.game_level, 
                 label_visibility="collapsed",
@@ -407,13 +527,15 @@ def main():
     
         with col_level_2:
             if st.button("시작", type="primary", use_container_width=False):
+                st.session_state.alphabet = st.session_state.alphabet_widget
                             
                 # [Step 2] AUTOPLAY 모드일 때 유효성 검사
                 if st.session_state.autoplay_checked:
                     
                     # 검증용 임시 객체 생성
-                    temp_game = NumberBaseballGame(n = st.session_state.game_level)
-                    input_val = st.session_state.manual_input_widget
+                    temp_game = NumberBaseballGame(n = st.session_state.game_level,
+                                                   digits=ALPHABETS[st.session_state.alphabet])
+                    input_val = st.session_state.manual_input_widget.upper()  # 16진수는 소문자도 허용
                     is_valid, err_msg = temp_game.validate_answer(input_val)
                     
                     if not is_valid:
@@ -422,10 +544,19 @@ def main():
                     else:
                         # 유효하면 값 저장하고 게임 시작
                         st.session_state.manual_input_value = input_val
+                        # 위젯 값은 페이지를 벗어나면 사라지므로 따로 저장해 둡니다.
+                        enabled = st.session_state.turbo_enabled_widget
+                        st.session_state.turbo_settings = {
+                            'enabled': enabled,
+                            'pace': st.session_state.get('turbo_pace_widget', 0.3) if enabled else 0.3,
+                            'results_only': st.session_state.get('turbo_results_only_widget', False) if enabled else False,
+                        }
                         start_game()
                         st.rerun()
                 # [Step 3] PLAYER MODE일 때는 그냥 시작
                 else:
+                    st.session_state.evil_host = (st.session_state.player_action == 'Attack'
+                                                  and st.session_state.get('evil_host_widget', False))
                     start_game()
                     st.rerun()
                 
@@ -453,12 +584,15 @@ def main():
             elif mode_str == 'GAME_STOPPED': # [추가] 중단 상태 표시
                 mode_str = "STOPPED"
                 
-            st.markdown(f"<h4 style='margin: 0; padding-top: 5px;'>Game Level: {st.session_state.game_level}</h4>", unsafe_allow_html=True)
+            level_str = f"{st.session_state.game_level}"
+            if st.session_state.alphabet != 'decimal':
+                level_str += f" ({st.session_state.alphabet})"
+            st.markdown(f"<h4 style='margin: 0; padding-top: 5px;'>Game Level: {level_str}</h4>", unsafe_allow_html=True)
         
         # 3. 우측: 연산 중단 버튼
         # 오직 '연산 중(AUTOPLAY_RUNNING)'일 때만 버튼을 보여줍니다.
         with top_col3:
-            if st.session_state.active_mode in ['AUTOPLAY_RUNNING', 'DEFENSE_CALCULATING']:
+            if st.session_state.active_mode in ['AUTOPLAY_RUNNING', 'AUTOPLAY_REPLAY', 'DEFENSE_CALCULATING']:
                 sub_c1, sub_c2 = st.columns([1, 2], gap="small")
                 
                 with sub_c1:
@@ -487,42 +621,74 @@ def main():
         # 채팅 영역과의 거리 벌리기 (Spacer)
         st.markdown('<div class="chat-area-spacer"></div>', unsafe_allow_html=True)
     
-        # 채팅 UI 렌더링 (개별 렌더링 방식)
+        # 채팅 UI 렌더링 (누적 렌더링 방식)
+        # 새 메시지의 HTML만 만들고, 말풍선은 CHUNK_SIZE개씩 하나의 요소로 묶어 그립니다.
+        chat_view = st.session_state.chat_view
+        chat_view.sync(st.session_state.messages)
         chat_container = st.container()
         
         with chat_container:
-            for msg in st.session_state.messages:
-                if msg["role"] == "user":
-                    # 사용자 메시지 HTML
-                    st.markdown(f"""
-                    <div class="message-row user-row">
-                        <div class="user-bubble">{msg['content']}</div>
-                        
-                    </div>
-                    """, unsafe_allow_html=True)
-                else:
-                    # 봇 메시지 HTML (여기에 unsafe_allow_html=True가 필수입니다!)
-                    st.markdown(f"""
-                    <div class="message-row bot-row">
-                        <div class="bot-bubble">{msg['content']}</div>
-                    </div>
-                    """, unsafe_allow_html=True)
+            # 기록이 길면 최근 묶음만 그리고, 이전 기록은 버튼을 눌렀을 때만 그립니다.
+            limit = None if st.session_state.show_full_history else chat_render.VISIBLE_BLOCKS
+            hidden = chat_view.hidden_count(chat_render.VISIBLE_BLOCKS)
+            if hidden and limit is not None:
+                if st.button(f"이전 기록 {hidden}개 보기"):
+                    st.session_state.show_full_history = True
+                    st.rerun()
+            
+            for block in chat_view.blocks(limit):
+                st.markdown(block, unsafe_allow_html=True)
+            
+            # AUTOPLAY 진행 중 새로 나오는 메시지를 그릴 자리
+            live_placeholder = st.empty()
         
         # 1. AUTOPLAY 준비 -> 실행
         if st.session_state.active_mode == 'AUTOPLAY_READY':
-            # 아주 짧은 텀을 주어 브라우저 랜더링 큐를 비웁니다.
-            time.sleep(0.05) 
             st.session_state.active_mode = 'AUTOPLAY_RUNNING'
             st.rerun()
         
         elif st.session_state.active_mode == 'AUTOPLAY_RUNNING':
             
-            # 자동 플레이 로직 실행
-            logic_autoplay()
-            
-            # 실행 후 모드를 변경하여 무한 반복 방지 및 입력창 비활성화 유지
-            st.session_state.active_mode = 'GAME_OVER'
+            if st.session_state.turbo_settings['enabled']:
+                # 터보: 먼저 전부 계산 -> 결과만 보여주거나 재생 단계로
+                st.session_state.active_mode = logic_autoplay_turbo()
+            else:
+                # 자동 플레이 로직 실행
+                logic_autoplay(live_placeholder)
+                
+                # 실행 후 모드를 변경하여 무한 반복 방지 및 입력창 비활성화 유지
+                st.session_state.active_mode = 'GAME_OVER'
             st.rerun()
+        
+        # 터보 재생: 계산은 끝났으므로 fragment만 일정 간격으로 다시 실행해 메시지를 하나씩 꺼냅니다.
+        # (간격 사이에는 스크립트 스레드를 붙잡고 있지 않습니다)
+        elif st.session_state.active_mode == 'AUTOPLAY_REPLAY':
+            pace = st.session_state.turbo_settings['pace']
+            
+            if pace <= 0:
+                st.session_state.messages.extend(
+                    {"role": "assistant", "content": msg} for msg in st.session_state.turbo_replay)
+                st.session_state.turbo_replay = []
+                st.session_state.active_mode = 'GAME_OVER'
+                st.rerun()
+            
+            replay_start = len(st.session_state.messages)
+            
+            @st.fragment(run_every=pace)
+            def replay_step():
+                if st.session_state.active_mode != 'AUTOPLAY_REPLAY':
+                    return
+                if not st.session_state.turbo_replay:
+                    st.session_state.active_mode = 'GAME_OVER'
+                    st.rerun()  # 전체 화면을 다시 그려 기록에 합칩니다.
+                
+                message = {"role": "assistant", "content": st.session_state.turbo_replay.pop(0)}
+                st.session_state.messages.append(message)
+                # 재생 중에는 바깥 채팅 영역이 다시 그려지지 않으므로 이번 재생분을 여기서 그립니다.
+                replayed = st.session_state.messages[replay_start:]
+                st.markdown("\n".join(chat_render.bubble_html(m) for m in replayed), unsafe_allow_html=True)
+            
+            replay_step()
             
         # 사용자가 중단 버튼을 눌렀을 때 메시지 표시
         elif st.session_state.active_mode == 'GAME_STOPPED':
@@ -573,12 +739,13 @@ def main():
                         
                     if current_mode == 'ATTACK':
                         game_instance = st.session_state.game_instance
-                        is_valid, err_msg = game_instance.validate_answer(prompt)
+                        guess = prompt.upper()  # 16진수는 소문자도 허용 (숫자에는 영향 없음)
+                        is_valid, err_msg = game_instance.validate_answer(guess)
                         
                         if not is_valid:
                             st.session_state.messages.append({"role": "assistant", "content": err_msg}) # game.py에서 온 에러 메시지 출력
                         else:
-                            s, b, response = logic_player_attack(prompt)
+                            s, b, response = logic_player_attack(guess)
                             if s == st.session_state.game_level:
                                 st.session_state.messages.append({"role": "assistant", "content": response})
                                 st.session_state.active_mode = 'GAME_OVER'
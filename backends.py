@@ -0,0 +1,554 @@
+"""
+미니맥스 '다음 추측' 계산 백엔드 모음과 디스패처
+
+같은 계산(모든 추측 후보 x 남은 정답 후보의 (S, B) 분할)을 여러 방식으로 수행합니다.
+
+- serial  : 문자열 비교로 한 줄씩 계산 (원래 game.py 방식, 검증용 기준 구현)
+- vector  : 숫자를 비트마스크로 바꿔 AND + bit_count()로 한 번에 S/B를 계산 (현재 프로세스)
+- thread  : vector 커널을 스레드 풀에 나눠서 계산 (GIL이 없는 파이썬에서 유리)
+- process : vector 커널을 프로세스 풀에 나눠서 계산 (코어 수만큼 병렬)
+- auto    : 이번 턴의 연산량 |추측| x |후보|를 보고 예상 시간이 가장 짧은 백엔드를 고릅니다.
+            백엔드별 속도는 처음 auto를 쓸 때 짧은 측정(calibrate)으로 정합니다.
+            측정은 프로세스 풀을 띄우고 워커마다 테이블을 만드는 비용까지 포함하므로,
+            미리 데우기(prewarm)를 하지 않으면 그 비용을 첫 auto 턴이 치릅니다.
+
+모든 백엔드는 같은 동점 규칙을 따르므로 항상 같은 추측을 돌려줍니다.
+(최악의 경우가 더 작으면 교체, 같으면 '정답 후보'인 추측으로 교체)
+"""
+
+import collections
+import concurrent.futures
+import itertools
+import os
+import sys
+import threading
+import time
+
+from state import bitmap_to_indices, indices_to_bitmap
+
+
+BACKENDS = ("serial", "vector", "thread", "process")
+
+POLL_INTERVAL = 0.05  # 워커 결과를 기다리는 동안 중단 요청을 확인하는 주기 (초)
+
+
+# --- 레벨별 공용 테이블 ---
+
+class LevelTables:
+    """
+    한 레벨의 전체 숫자 목록과 비트마스크 인코딩입니다. (프로세스당 레벨별로 한 번만 만듭니다)
+    - pos_masks[i]   : (자리 * 기호 수 + 기호) 비트 -> 겹치는 비트 수 = 스트라이크
+    - digit_masks[i] : 기호 비트 -> 겹치는 비트 수 = 공통 숫자 (S + B)
+    마스크 폭은 기호 수에 맞춰 정해지므로(자리 x 기호 수 비트) 16진수 등 더 큰 기호 집합도 같은 커널을 씁니다.
+    커널의 결과 키는 (S << feedback_shift) | (S + B)입니다.
+    """
+
+    def __init__(self, digits: str, level: int, numbers=None):
+        # numbers를 주면 전체 목록 대신 그 숫자들만 인코딩합니다. (표본 탐색용 작은 테이블)
+        self.digits = digits
+        self.level = level
+        if numbers is None:
+            numbers = ("".join(p) for p in itertools.permutations(digits, level))
+        self.numbers = tuple(numbers)
+        self.index_of = {number: i for i, number in enumerate(self.numbers)}
+
+        base = len(digits)
+        self.feedback_shift = max(4, level.bit_length())
+        symbol_of = {ch: i for i, ch in enumerate(digits)}
+        self.pos_masks = []
+        self.digit_masks = []
+        for number in self.numbers:
+            pos_mask = 0
+            digit_mask = 0
+            for pos, ch in enumerate(number):
+                pos_mask |= 1 << (pos * base + symbol_of[ch])
+                digit_mask |= 1 << symbol_of[ch]
+            self.pos_masks.append(pos_mask)
+            self.digit_masks.append(digit_mask)
+
+    def indices(self, numbers) -> list[int]:
+        index_of = self.index_of
+        return [index_of[number] for number in numbers]
+
+
+_tables = {}
+
+
+def level_tables(digits: str, level: int) -> LevelTables:
+    tables = _tables.get((digits, level))
+    if tables is None:
+        tables = _tables[(digits, level)] = LevelTables(digits, level)
+    return tables
+
+
+def tables_built(digits: str, level: int) -> bool:
+    """이 프로세스에서 해당 레벨의 전체 테이블을 이미 만들었는지 (메모리 예산 계산용)"""
+    return (digits, level) in _tables
+
+
+def built_tables() -> list[tuple[str, int]]:
+    """지금 들고 있는 전체 테이블의 (기호 집합, 레벨) 목록"""
+    return list(_tables)
+
+
+def release_tables(digits: str, level: int):
+    """공용 테이블을 놓습니다. (메모리 예산이 모자랄 때, 그 레벨을 쓰는 게임이 없을 때만 부름)"""
+    _tables.pop((digits, level), None)
+
+
+# --- 커널 ---
+# 반환값은 모두 (최악의 경우 크기, 최선의 추측, 그 추측이 정답 후보인지)입니다.
+# 구간(shard)별 결과를 순서대로 합쳐도 전체를 한 번에 계산한 것과 같도록 동점 정보를 함께 돌려줍니다.
+
+def _worker_calculate_guess(candidates, all_possible_numbers):
+    """
+    실제 미니맥스 알고리즘을 수행하는 기준(serial) 구현입니다. 다음 추측 문자열을 반환합니다.
+    메인 프로세스와 메모리를 공유하지 않으므로 필요한 데이터(후보군 리스트 등)를 인자로 모두 받아야 합니다.
+    """
+    # 최적화: 남은 후보가 2개 이하면 계산 불필요
+    if len(candidates) <= 2:
+        return candidates[0]
+    return _serial_kernel(candidates, all_possible_numbers)[1]
+
+
+def _serial_kernel(candidates, guesses, should_stop=None):
+    min_worst_case_size = float('inf')
+    best_guess = ""
+    best_is_candidate = False
+    candidate_set = set(candidates)
+
+    for potential_guess in guesses:
+        if should_stop and should_stop():
+            raise InterruptedError("Game Stopped by User")
+
+        partitions = collections.defaultdict(int)
+
+        for candidate in candidates:
+            # --- [check_sb 로직 인라인 시작] ---
+            strikes = 0
+            for g, a in zip(potential_guess, candidate):
+                if g == a:
+                    strikes += 1
+            common_digits = len(set(potential_guess) & set(candidate))
+            balls = common_digits - strikes
+            # --- [check_sb 로직 인라인 끝] ---
+
+            partitions[(strikes, balls)] += 1
+
+        if not partitions:
+            continue
+
+        worst_case_size = max(partitions.values())
+
+        if worst_case_size < min_worst_case_size:
+            min_worst_case_size = worst_case_size
+            best_guess = potential_guess
+            best_is_candidate = potential_guess in candidate_set
+
+        elif worst_case_size == min_worst_case_size:
+            if potential_guess in candidate_set:
+                best_guess = potential_guess
+                best_is_candidate = True
+
+    return min_worst_case_size, best_guess, best_is_candidate
+
+
+def _vector_kernel(tables, candidate_indices, guess_indices, should_stop=None):
+    pos_masks = tables.pos_masks
+    digit_masks = tables.digit_masks
+    shift = tables.feedback_shift
+    pairs = [(pos_masks[c], digit_masks[c]) for c in candidate_indices]
+    candidate_set = set(candidate_indices)
+    counter = collections.Counter
+
+    min_worst_case_size = float('inf')
+    best_guess = -1
+    best_is_candidate = False
+
+    for n, g in enumerate(guess_indices):
+        # 중단 확인은 256개마다 한 번 (확인 자체의 비용을 줄이기 위함)
+        if should_stop and not n & 255 and should_stop():
+            raise InterruptedError("Game Stopped by User")
+
+        pg = pos_masks[g]
+        dg = digit_masks[g]
+        partitions = counter([((pg & p).bit_count() << shift) | (dg & d).bit_count() for p, d in pairs])
+        if not partitions:
+            continue
+
+        worst_case_size = max(partitions.values())
+
+        if worst_case_size < min_worst_case_size:
+            min_worst_case_size = worst_case_size
+            best_guess = g
+            best_is_candidate = g in candidate_set
+
+        elif worst_case_size == min_worst_case_size:
+            if g in candidate_set:
+                best_guess = g
+                best_is_candidate = True
+
+    return min_worst_case_size, best_guess, best_is_candidate
+
+
+def filter_numbers(tables, numbers, guess: str, s: int, b: int) -> list[str]:
+    """numbers 중 guess에 (s, b)로 답하는 숫자만 (check_sb 문자열 비교 대신 마스크 AND + bit_count)"""
+    index_of = tables.index_of
+    pos_masks = tables.pos_masks
+    digit_masks = tables.digit_masks
+    g = index_of[guess]
+    pg = pos_masks[g]
+    dg = digit_masks[g]
+    common = s + b
+    result = []
+    for number in numbers:
+        i = index_of[number]
+        if (pg & pos_masks[i]).bit_count() == s and (dg & digit_masks[i]).bit_count() == common:
+            result.append(number)
+    return result
+
+
+def _merge(results):
+    """구간별 결과를 추측 순서대로 합칩니다. (한 번에 계산했을 때와 같은 동점 처리)"""
+    best = (float('inf'), None, False)
+    for worst, guess, is_candidate in results:
+        if worst < best[0] or (worst == best[0] and is_candidate):
+            best = (worst, guess, is_candidate)
+    return best
+
+
+def _shards(guess_indices, count):
+    """추측 목록을 count개의 연속 구간으로 나눕니다. (range는 range 그대로 잘라 피클링을 가볍게)"""
+    size = -(-len(guess_indices) // count)
+    return [guess_indices[i:i + size] for i in range(0, len(guess_indices), size)]
+
+
+# --- 스레드/프로세스 풀 ---
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+# 프로세스 워커에서 이미 실행 중인 조각에 중단 신호를 전하는 공유 플래그 (계산 하나당 한 칸)
+CANCEL_SLOTS = 64
+_cancel_flags = None        # 메인 프로세스: 풀과 함께 만든 공유 배열 / 워커: initializer로 받은 같은 배열
+_free_cancel_slots = []
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def get_pool(kind: str):
+    """백엔드별 공용 풀을 돌려줍니다. (요청마다 새로 띄우지 않고 프로세스당 하나를 재사용)"""
+    global _cancel_flags, _free_cancel_slots
+    with _pools_lock:
+        pool = _pools.get(kind)
+        if pool is None:
+            if kind == "process":
+                import multiprocessing  # 프로세스 백엔드를 처음 쓸 때만 불러옵니다.
+
+                _cancel_flags = multiprocessing.RawArray("b", CANCEL_SLOTS)
+                _free_cancel_slots = list(range(CANCEL_SLOTS))
+                pool = concurrent.futures.ProcessPoolExecutor(max_workers=default_workers(),
+                                                              initializer=_init_process_worker,
+                                                              initargs=(_cancel_flags,))
+            else:
+                pool = concurrent.futures.ThreadPoolExecutor(max_workers=default_workers(),
+                                                             thread_name_prefix="minimax")
+            _pools[kind] = pool
+        return pool
+
+
+def shutdown_pools():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        _pools.clear()
+        _worker_tables.clear()
+
+
+# process 워커들에 이미 보낸 (기호 집합, 레벨) - 워커가 그 레벨의 테이블을 이미 만들었다고 봅니다.
+_worker_tables = set()
+
+
+def note_worker_tables(digits: str, level: int):
+    """process 워커들이 이 레벨의 테이블을 갖고 있다고 기록합니다. (비용 모델이 테이블 생성 비용을 빼도록)"""
+    _worker_tables.add((digits, level))
+
+
+def _init_process_worker(cancel_flags):
+    global _cancel_flags
+    _cancel_flags = cancel_flags
+
+
+class _SharedCancel:
+    """
+    프로세스 워커들과 공유하는 중단 플래그 한 칸. threading.Event처럼 set()으로 중단 신호를 보냅니다.
+    빈 칸이 없으면(slot=None) 아직 시작하지 않은 조각만 취소됩니다.
+    """
+
+    def __init__(self):
+        with _pools_lock:
+            self.flags = _cancel_flags
+            self.slot = _free_cancel_slots.pop() if _free_cancel_slots else None
+        if self.slot is not None:
+            self.flags[self.slot] = 0
+
+    def set(self):
+        if self.slot is not None:
+            self.flags[self.slot] = 1
+
+    def release_when_done(self, futures):
+        """중단된 뒤에도 실행 중인 조각이 플래그를 읽으므로, 모든 조각이 끝난 뒤에 칸을 돌려줍니다."""
+        if self.slot is None:
+            return
+        remaining = [len(futures)]
+        lock = threading.Lock()
+
+        def on_done(_):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            with _pools_lock:
+                # 그사이 풀을 새로 만들었다면 이전 배열의 칸은 돌려주지 않습니다.
+                if _cancel_flags is self.flags:
+                    _free_cancel_slots.append(self.slot)
+
+        for future in futures:
+            future.add_done_callback(on_done)
+
+
+def _process_shard(digits, level, alive_bitmap, guess_indices, cancel_slot=None):
+    """
+    프로세스 워커에서 실행됩니다. 테이블은 워커 안에서 레벨별로 한 번만 만들어 재사용합니다.
+    후보는 인덱스 리스트 대신 비트맵으로 받아 프로세스 간 전달량을 줄입니다.
+    cancel_slot이 있으면 공유 플래그의 그 칸을 보고 실행 중에도 멈춥니다.
+    """
+    should_stop = None if cancel_slot is None else (lambda: _cancel_flags[cancel_slot])
+    return _vector_kernel(level_tables(digits, level), bitmap_to_indices(alive_bitmap), guess_indices,
+                          should_stop)
+
+
+def _wait_all(futures, stop_callback, cancel_event=None):
+    """
+    워커 결과를 기다리면서 주기적으로 중단 요청을 확인합니다.
+    중단되면 아직 시작하지 않은 작업은 취소하고 InterruptedError를 일으킵니다.
+    """
+    pending = set(futures)
+    while pending:
+        _, pending = concurrent.futures.wait(pending, timeout=POLL_INTERVAL)
+        if pending and stop_callback and stop_callback():
+            if cancel_event is not None:
+                cancel_event.set()
+            for future in pending:
+                future.cancel()
+            raise InterruptedError("Game Stopped by User")
+    return [future.result() for future in futures]
+
+
+# --- 비용 모델 / 디스패처 ---
+
+class CostModel:
+    """
+    백엔드별 예상 소요 시간 = 고정 오버헤드 + 연산량(|추측| x |후보|) x 연산 1회 시간 / 병렬도
+    process는 워커가 아직 그 레벨의 테이블이 없으면 테이블 생성 시간(table_numbers x table_ns)이 더해집니다.
+    calibrate()가 실제로 짧게 돌려 본 값으로 채웁니다.
+    """
+
+    def __init__(self, serial_ns, vector_ns, thread_overhead, process_overhead, workers, parallel_threads,
+                 table_ns=0.0):
+        self.serial_ns = serial_ns
+        self.vector_ns = vector_ns
+        self.thread_overhead = thread_overhead
+        self.process_overhead = process_overhead  # 대표 구간 한 턴의 전달(후보 비트맵 피클링 포함) + 결과 수집
+        self.workers = workers
+        self.parallel_threads = parallel_threads  # GIL 없이 스레드가 실제로 병렬 실행되는지
+        self.table_ns = table_ns                  # 테이블 생성 시간 (숫자 하나당)
+
+    def estimate(self, backend: str, ops: int, table_numbers: int = 0) -> float:
+        if backend == "serial":
+            return ops * self.serial_ns * 1e-9
+        if backend == "vector":
+            return ops * self.vector_ns * 1e-9
+        if backend == "thread":
+            parallel = self.workers if self.parallel_threads else 1
+            return self.thread_overhead + ops * self.vector_ns * 1e-9 / parallel
+        if backend == "process":
+            return (self.process_overhead + table_numbers * self.table_ns * 1e-9
+                    + ops * self.vector_ns * 1e-9 / self.workers)
+        raise ValueError(f"알 수 없는 백엔드: {backend}")
+
+    def choose(self, ops: int, allow_process: bool = True, table_numbers: int = 0) -> str:
+        candidates = BACKENDS if allow_process else tuple(b for b in BACKENDS if b != "process")
+        return min(candidates, key=lambda backend: self.estimate(backend, ops, table_numbers))
+
+    def thresholds(self) -> dict:
+        """vector(현재 프로세스)보다 풀에 나눠 맡기는 편이 빨라지는 연산량 (병렬 이득이 없으면 None)"""
+        def crossover(overhead, parallel):
+            saving_per_op = self.vector_ns * 1e-9 * (1 - 1 / parallel)
+            return int(overhead / saving_per_op) if saving_per_op > 0 else None
+
+        return {
+            "thread": crossover(self.thread_overhead, self.workers if self.parallel_threads else 1),
+            "process": crossover(self.process_overhead, self.workers),
+        }
+
+    def as_dict(self) -> dict:
+        return {
+            "serial_ns": round(self.serial_ns, 1),
+            "vector_ns": round(self.vector_ns, 1),
+            "thread_overhead_ms": round(self.thread_overhead * 1000, 2),
+            "process_overhead_ms": round(self.process_overhead * 1000, 2),
+            "table_ns": round(self.table_ns, 1),
+            "workers": self.workers,
+            "thresholds": self.thresholds(),
+        }
+
+
+_cost_model = None
+_calibrate_lock = threading.Lock()
+
+
+def calibrate(force: bool = False) -> CostModel:
+    """
+    짧은 측정으로 백엔드별 속도를 잽니다. (수십 ms ~ 워커 생성 시간, 프로세스당 한 번)
+    프로세스 백엔드를 쓸 수 있는 환경이면 이 과정에서 워커를 모두 띄우고 4자리 테이블까지 만들어 둡니다.
+    """
+    global _cost_model
+    with _calibrate_lock:
+        if _cost_model is not None and not force:
+            return _cost_model
+
+        tables = level_tables("1234567890", 3)
+        candidates = list(range(0, len(tables.numbers), 3))   # 240개
+        guesses = range(0, len(tables.numbers), 3)            # 240개
+        ops = len(candidates) * len(guesses)
+
+        started = time.perf_counter()
+        _vector_kernel(tables, candidates, guesses)
+        vector_ns = (time.perf_counter() - started) / ops * 1e9
+
+        strings = [tables.numbers[i] for i in candidates]
+        started = time.perf_counter()
+        _serial_kernel(strings[:60], strings[:60])
+        serial_ns = (time.perf_counter() - started) / (60 * 60) * 1e9
+
+        # 워커가 처음 보는 레벨이면 _process_shard가 치르는 테이블 생성 시간 (숫자 하나당)
+        started = time.perf_counter()
+        LevelTables("1234567890", 3)
+        table_ns = (time.perf_counter() - started) / len(tables.numbers) * 1e9
+
+        workers = default_workers()
+        parallel_threads = not getattr(sys, "_is_gil_enabled", lambda: True)()
+
+        # 풀에 빈 작업을 한 번 보냈다가 받는 왕복 시간을 오버헤드로 봅니다. (첫 호출은 풀 생성 비용 포함이라 제외)
+        thread_overhead = _roundtrip(get_pool("thread"))
+        process_overhead = _process_roundtrip(vector_ns, workers) if workers > 1 else float('inf')
+
+        _cost_model = CostModel(serial_ns, vector_ns, thread_overhead, process_overhead,
+                                workers, parallel_threads, table_ns)
+        return _cost_model
+
+
+def _roundtrip(pool) -> float:
+    pool.submit(int).result()
+    started = time.perf_counter()
+    pool.submit(int).result()
+    return time.perf_counter() - started
+
+
+def _process_roundtrip(vector_ns: float, workers: int) -> float:
+    """
+    대표 구간(4자리, 첫 추측 0S 1B 뒤의 실제 후보 x 전체 숫자 10개 중 1개)을 워커 수만큼 나눠 보내는 한 턴의 오버헤드
+    첫 번째는 워커를 모두 띄우고 워커마다 4자리 테이블을 만드는 준비로 쓰고, 두 번째를 잽니다.
+    오버헤드 = 걸린 시간 - 연산 시간 (후보 비트맵 피클링, 구간 전달, 결과 수집)
+    """
+    digits, level = "1234567890", 4
+    tables = level_tables(digits, level)
+    candidates = tables.indices(filter_numbers(tables, tables.numbers, digits[:level], 0, 1))
+    alive_bitmap = indices_to_bitmap(candidates)
+    guesses = range(0, len(tables.numbers), 10)
+    pool = get_pool("process")
+
+    def run():
+        futures = [pool.submit(_process_shard, digits, level, alive_bitmap, shard)
+                   for shard in _shards(guesses, workers)]
+        _merge([future.result() for future in futures])
+
+    run()
+    note_worker_tables(digits, level)
+    started = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - started
+    return max(elapsed - len(candidates) * len(guesses) * vector_ns * 1e-9 / workers, _roundtrip(pool))
+
+
+def choose_backend(num_guesses: int, num_candidates: int, allow_process: bool = True,
+                   table_numbers: int = 0) -> str:
+    return calibrate().choose(num_guesses * num_candidates, allow_process, table_numbers)
+
+
+def find_best_guess_sampled(digits, level, candidates, guesses, stop_callback=None):
+    """
+    표본 미니맥스: 주어진 후보/추측 표본만으로 작은 테이블을 만들어 vector 커널로 계산합니다.
+    전체 테이블 없이 돌고 메모리/시간이 표본 크기에만 비례합니다. (메모리 예산을 넘는 턴에서 사용)
+    - candidates, guesses: 숫자 문자열 리스트 (추측 표본은 후보 표본을 포함하는 것이 좋음)
+    - 반환값: (추측, "sampled")
+    """
+    numbers = list(dict.fromkeys([*candidates, *guesses]))
+    tables = LevelTables(digits, level, numbers)
+    candidate_indices = tables.indices(candidates)
+    guess_indices = tables.indices(dict.fromkeys(guesses))
+    result = _vector_kernel(tables, candidate_indices, guess_indices, stop_callback)
+    return tables.numbers[result[1]], "sampled"
+
+
+def find_best_guess(digits, level, candidates, guesses=None, backend="auto", stop_callback=None):
+    """
+    미니맥스로 최악의 경우를 최소화하는 다음 추측을 찾습니다.
+    - guesses=None 이면 해당 레벨의 전체 숫자를 추측 후보로 씁니다.
+    - 반환값: (추측, 실제로 사용한 백엔드)
+    """
+    tables = level_tables(digits, level)
+    num_guesses = len(tables.numbers) if guesses is None else len(guesses)
+
+    if backend == "auto":
+        import memory  # memory가 backends를 불러오므로 여기서 불러옵니다.
+
+        # process 워커는 테이블을 각자 만들므로, 워커 수만큼의 테이블이 예산을 넘으면 고르지 않습니다.
+        table_numbers = 0 if (digits, level) in _worker_tables else len(tables.numbers)
+        backend = choose_backend(num_guesses, len(candidates), memory.process_tables_fit(digits, level),
+                                 table_numbers)
+
+    if backend == "serial":
+        guess_strings = tables.numbers if guesses is None else guesses
+        return _serial_kernel(candidates, guess_strings, stop_callback)[1], backend
+
+    candidate_indices = tables.indices(candidates)
+    guess_indices = range(len(tables.numbers)) if guesses is None else tables.indices(guesses)
+
+    if backend == "vector":
+        result = _vector_kernel(tables, candidate_indices, guess_indices, stop_callback)
+
+    elif backend == "thread":
+        cancel_event = threading.Event()
+        pool = get_pool("thread")
+        futures = [pool.submit(_vector_kernel, tables, candidate_indices, shard, cancel_event.is_set)
+                   for shard in _shards(guess_indices, default_workers())]
+        result = _merge(_wait_all(futures, stop_callback, cancel_event))
+
+    elif backend == "process":
+        pool = get_pool("process")
+        alive_bitmap = indices_to_bitmap(candidate_indices)
+        cancel = _SharedCancel()
+        futures = [pool.submit(_process_shard, digits, level, alive_bitmap, shard, cancel.slot)
+                   for shard in _shards(guess_indices, default_workers())]
+        cancel.release_when_done(futures)
+        note_worker_tables(digits, level)
+        result = _merge(_wait_all(futures, stop_callback, cancel))
+
+    else:
+        raise ValueError(f"알 수 없는 백엔드: {backend}")
+
+    return tables.numbers[result[1]], backend
@@ -0,0 +1,160 @@
+"""
+헤드리스 배치 풀이 (JSON-lines 입출력)
+
+Streamlit 없이 NumberBaseballGame 엔진을 데이터 파이프라인에 붙이기 위한 명령줄 도구입니다.
+한 줄에 요청 하나(JSON)를 읽어, 결과도 한 줄에 하나씩 바로 출력합니다. (입력과 같은 순서)
+
+요청 형식:
+    {"id": "a1", "level": 4, "secret": "1234"}                          # AUTOPLAY로 끝까지 풀기
+    {"id": "b7", "level": 5, "history": [["12345", 0, 2], ["67890", 1, 2]]}  # 기록 다음의 추측 하나
+    {"id": "h1", "level": 5, "digits": "1234567890ABCDEF", "secret": "A1F3C"}  # 16진수 등 다른 기호 집합
+    - id는 생략 가능 (생략하면 입력 줄 번호), digits는 생략하면 0~9
+
+결과 형식:
+    {"id": "a1", "level": 4, "solved": true, "guess_count": 5, "guesses": ["1234", ...], "seconds": 0.01}
+    {"id": "b7", "level": 5, "next_guess": "13579", "candidates": 42, "seconds": 0.2}
+    {"id": "x", "error": "..."}                                         # 잘못된 요청 (다른 요청은 계속 처리)
+
+워커 프로세스 수만큼 동시에 처리하되, 동시에 들고 있는 요청은 --max-pending개까지만이라
+입력이 아무리 커도 메모리 사용량은 일정합니다.
+
+사용법:
+    python batch.py requests.jsonl > results.jsonl
+    cat requests.jsonl | python batch.py --workers 8
+    python batch.py --guess-pool auto requests.jsonl    # 후반 턴은 축소 추측 집합으로 (guess_pool 모듈)
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import json
+import os
+import sys
+import time
+
+import backends
+import strategy_tree
+from game import NumberBaseballGame, max_level
+
+
+# --- 요청 하나 처리 (워커 프로세스) ---
+
+def _new_game(level: int, guess_pool: str = "full", digits: str = None) -> NumberBaseballGame:
+    # 워커 하나가 요청 하나를 맡으므로 안쪽 계산은 프로세스 풀 없이 vector 커널로 돌립니다.
+    game = NumberBaseballGame(n=level, backend="vector", guess_pool=guess_pool, digits=digits)
+    tree_path = strategy_tree.default_tree_path(level, game.DIGITS)
+    if os.path.exists(tree_path):
+        game.load_strategy_tree(tree_path)
+    return game
+
+
+def _solve_secret(game: NumberBaseballGame, secret: str) -> dict:
+    result = game.solve(secret)
+    if result["error"]:
+        raise ValueError(result["error"])
+    return {
+        "solved": result["solved"],
+        "guess_count": result["guess_count"],
+        "guesses": [turn["guess"] for turn in result["turns"]],
+    }
+
+
+def _next_guess(game: NumberBaseballGame, history: list) -> dict:
+    for guess, _, _ in history:
+        is_valid, err_msg = game.validate_answer(guess)
+        if not is_valid:
+            raise ValueError(err_msg)
+    # 전체 후보를 만든 뒤 거르지 않고, 기록과 맞는 숫자만 바로 만듭니다.
+    game.load_history(history)
+
+    if not game.candidates:
+        raise ValueError("후보 리스트가 비었습니다. (모순된 기록)")
+    # 첫 추측은 play_game과 같이 하드코딩, 그 뒤로는 엔진 계산 (전략 트리/공유 캐시 포함)
+    next_guess = game.DIGITS[:game.scale] if not history else game.find_next_best_guess()
+    return {"next_guess": next_guess, "candidates": len(game.candidates)}
+
+
+def handle_line(line_no: int, line: str, guess_pool: str = "full") -> str:
+    """입력 한 줄 -> 출력 한 줄 (JSON). 요청 하나의 오류는 error 필드로 돌려주고 예외를 올리지 않습니다."""
+    request_id = line_no
+    try:
+        request = json.loads(line)
+        if not isinstance(request, dict):
+            raise TypeError(f"요청은 JSON 객체여야 합니다: {type(request).__name__}")
+        request_id = request.get("id", line_no)
+        level = request["level"]
+        if not isinstance(level, int) or isinstance(level, bool):
+            raise TypeError(f"level은 정수여야 합니다: {level!r}")
+        digits = str(request.get("digits", NumberBaseballGame.DIGITS))
+        if not 3 <= level <= max_level(digits):
+            raise ValueError(f"지원하지 않는 자릿수입니다: {level} (기호 {len(digits)}개는 3~{max_level(digits)}자리)")
+
+        started = time.perf_counter()
+        game = _new_game(level, guess_pool, digits)
+        if "secret" in request:
+            result = _solve_secret(game, str(request["secret"]))
+        elif "history" in request:
+            result = _next_guess(game, request["history"])
+        else:
+            raise ValueError("요청에 secret 또는 history가 필요합니다.")
+        result = {"id": request_id, "level": level, **result, "seconds": time.perf_counter() - started}
+    except (ValueError, KeyError, TypeError) as exc:
+        result = {"id": request_id, "error": f"{type(exc).__name__}: {exc}"}
+    return json.dumps(result, ensure_ascii=False)
+
+
+# --- 스트리밍 ---
+
+def _requests(lines):
+    """(줄 번호, 내용) 스트림. 빈 줄은 건너뜁니다."""
+    for line_no, line in enumerate(lines, start=1):
+        if line.strip():
+            yield line_no, line
+
+
+def stream_results(lines, workers: int = None, max_pending: int = None, guess_pool: str = "full"):
+    """
+    요청 줄들을 읽으며 결과 줄을 입력 순서대로 내보냅니다. (제너레이터)
+    앞선 요청이 끝나는 대로 바로 내보내고, 처리 중인 요청이 max_pending개면 입력을 더 읽지 않습니다.
+    """
+    workers = workers or backends.default_workers()
+    max_pending = max_pending or workers * 4
+
+    if workers == 1:
+        for line_no, line in _requests(lines):
+            yield handle_line(line_no, line, guess_pool)
+        return
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = collections.deque()
+        for line_no, line in _requests(lines):
+            pending.append(pool.submit(handle_line, line_no, line, guess_pool))
+            # 순서를 지키기 위해 맨 앞 요청부터만 내보냅니다.
+            while pending and (pending[0].done() or len(pending) >= max_pending):
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="숫자야구 헤드리스 배치 풀이 (JSON-lines)")
+    parser.add_argument("input", nargs="?", help="요청 파일 (생략하거나 '-'면 표준 입력)")
+    parser.add_argument("--workers", type=int, default=None, help="워커 프로세스 수 (기본: 코어 수)")
+    parser.add_argument("--max-pending", type=int, default=None, help="동시에 들고 있는 최대 요청 수 (기본: 워커 x 4)")
+    parser.add_argument("--guess-pool", choices=("full", "reduced", "auto"), default="full",
+                        help="미니맥스 추측 집합 (auto: 5자리 이상 후반 턴만 후보 + 분리용 추측으로 축소)")
+    args = parser.parse_args()
+
+    source = sys.stdin if args.input in (None, "-") else open(args.input, encoding="utf-8")
+    try:
+        for result in stream_results(source, workers=args.workers, max_pending=args.max_pending,
+                                     guess_pool=args.guess_pool):
+            sys.stdout.write(result + "\n")
+            sys.stdout.flush()
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+기호 집합 크기 x 자릿수별 엔진 지연 시간 벤치마크
+
+기호 수(10진수 10개, 12개, 16진수 16개 ...)와 자릿수 k마다 두 번째 턴 하나를 재현해 단계별 시간을 잽니다.
+- tables  : 전체 숫자 테이블 생성 (backends.level_tables, 프로세스당 한 번)
+- filter  : 첫 추측 결과로 후보 거르기 - 문자열 비교(check_sb) / 비트마스크(backends.filter_numbers)
+- minimax : 두 번째 추측 계산 - 기호 대칭 대표만(guess_pool) / 전체 추측 (연산량이 --max-full-ops를 넘으면 생략)
+두 minimax 결과가 같은지도 함께 출력합니다.
+
+사용법:
+    python bench_alphabet.py
+    python bench_alphabet.py --alphabets 10 16 --levels 3 4 5 --max-full-ops 2e8
+"""
+
+import argparse
+import math
+import random
+import time
+
+import backends
+import guess_pool
+from game import NumberBaseballGame
+
+
+SYMBOLS = NumberBaseballGame.DIGITS + "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def timed(fn, *args, **kwargs):
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def symmetric_representatives(digits: str, level: int, candidates):
+    blocks = guess_pool.symmetry_blocks(digits, level, candidates)
+    return guess_pool.symmetric_guesses(digits, level, blocks)
+
+
+def bench_case(size: int, level: int, max_full_ops: float, seed: int = 0) -> dict:
+    digits = SYMBOLS[:size]
+    tables, tables_seconds = timed(backends.level_tables, digits, level)
+
+    game = NumberBaseballGame(n=level, backend="vector", digits=digits)
+    secret = "".join(random.Random(seed).sample(digits, level))
+    first_guess = digits[:level]
+    s, b = game.check_sb(first_guess, secret)
+    numbers = list(tables.numbers)
+
+    string_filtered, string_seconds = timed(
+        lambda: [n for n in numbers if game.check_sb(first_guess, n) == (s, b)])
+    candidates, mask_seconds = timed(backends.filter_numbers, tables, numbers, first_guess, s, b)
+    assert candidates == string_filtered
+
+    (firsts, lasts), prepare_seconds = timed(symmetric_representatives, digits, level, candidates)
+    (symmetric, _), symmetric_seconds = timed(
+        guess_pool.best_symmetric_guess, digits, level, candidates, firsts, lasts, backend="vector")
+
+    result = {
+        "symbols": size, "level": level, "universe": len(numbers), "candidates": len(candidates),
+        "tables": tables_seconds, "filter_string": string_seconds, "filter_mask": mask_seconds,
+        "representatives": len(firsts), "minimax_symmetric": prepare_seconds + symmetric_seconds,
+        "minimax_full": None, "same_guess": None,
+    }
+    if len(numbers) * len(candidates) <= max_full_ops:
+        (full, _), result["minimax_full"] = timed(
+            backends.find_best_guess, digits, level, candidates, None, backend="vector")
+        result["same_guess"] = full == symmetric
+    return result
+
+
+def format_seconds(value) -> str:
+    return "-" if value is None else f"{value:.3f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="기호 집합 크기 x 자릿수별 엔진 지연 시간")
+    parser.add_argument("--alphabets", nargs="+", type=int, default=[10, 12, 16], help="기호 수 목록")
+    parser.add_argument("--levels", nargs="+", type=int, default=[3, 4, 5], help="자릿수 목록")
+    parser.add_argument("--max-universe", type=float, default=6e5, help="전체 숫자 수가 이보다 크면 건너뜀")
+    parser.add_argument("--max-full-ops", type=float, default=5e7, help="전체 추측 minimax를 돌릴 최대 연산량")
+    args = parser.parse_args()
+
+    header = (f"{'기호':>4} {'k':>2} {'전체':>9} {'후보':>8} {'테이블':>7} {'문자열':>7} {'마스크':>7}"
+              f" {'대표':>6} {'대칭':>7} {'전체탐색':>8}  같음")
+    print(header)
+    for size in args.alphabets:
+        for level in args.levels:
+            if level > size or len(SYMBOLS) < size:
+                continue
+            universe = math.perm(size, level)
+            if universe > args.max_universe:
+                print(f"{size:>4} {level:>2} {universe:>9}  (--max-universe 초과, 건너뜀)")
+                continue
+            r = bench_case(size, level, args.max_full_ops)
+            same = "-" if r["same_guess"] is None else ("O" if r["same_guess"] else "X")
+            print(f"{size:>4} {level:>2} {r['universe']:>9} {r['candidates']:>8}"
+                  f" {format_seconds(r['tables']):>7} {format_seconds(r['filter_string']):>7}"
+                  f" {format_seconds(r['filter_mask']):>7} {r['representatives']:>6}"
+                  f" {format_seconds(r['minimax_symmetric']):>7} {format_seconds(r['minimax_full']):>8}  {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+채팅 렌더링 rerun 비용 벤치마크
+
+기록 길이별로 rerun 한 번에 드는 비용을 예전 방식(메시지마다 HTML 생성 + st.markdown 요소 하나)과
+누적 방식(chat_render.ChatHistoryView)으로 비교합니다.
+
+Streamlit 없이 돌 수 있도록 st.markdown 대신 '요소 하나를 내보내는' 비용을 흉내 냅니다.
+- 요소마다 내용 해시를 계산합니다. (Streamlit이 메시지 캐시에 쓰는 것과 같은 작업)
+- MIN_CACHED_SIZE 이상이고 이미 보낸 적 있는 내용이면 전송량에 넣지 않습니다. (브라우저 쪽 메시지 캐시)
+
+사용법:
+    python bench_render.py
+"""
+
+import hashlib
+import time
+
+import chat_render
+
+
+MIN_CACHED_SIZE = 10 * 1024  # Streamlit global.minCachedMessageSize 기본값
+
+
+def make_messages(count):
+    messages = []
+    for i in range(count):
+        if i % 2:
+            messages.append({"role": "user", "content": "1s 2b"})
+        else:
+            messages.append({"role": "assistant", "content": (
+                f"--- {i}회차 추측 ---\n\n계산 시작... (현재 후보: 123개)\n\n컴퓨터의 추측: 1234\n\n결과: 1S 2B")})
+    return messages
+
+
+class FakeFrontend:
+    """st.markdown 호출 하나 = 요소 하나. 캐시되지 않은 내용만 '전송'한 것으로 셉니다."""
+
+    def __init__(self):
+        self.cache = set()
+        self.elements = 0
+        self.sent_bytes = 0
+
+    def markdown(self, body):
+        data = body.encode()
+        digest = hashlib.md5(data).digest()
+        self.elements += 1
+        if digest not in self.cache:
+            self.sent_bytes += len(data)
+            if len(data) >= MIN_CACHED_SIZE:
+                self.cache.add(digest)
+
+
+def rerun_old(messages, frontend):
+    # 예전 app.py: 매 rerun마다 전체 기록을 돌며 메시지마다 HTML을 새로 만들어 요소 하나씩 내보냄
+    for msg in messages:
+        side = "user" if msg["role"] == "user" else "bot"
+        frontend.markdown(f"""
+        <div class="message-row {side}-row">
+            <div class="{side}-bubble">{msg['content']}</div>
+        </div>
+        """)
+
+
+def rerun_new(messages, frontend, view):
+    view.sync(messages)
+    for block in view.blocks(chat_render.VISIBLE_BLOCKS):
+        frontend.markdown(block)
+
+
+def measure(history_size, reruns=50):
+    """history_size개 기록 위에서 메시지를 하나씩 추가하며 reruns번 rerun했을 때의 평균 비용"""
+    results = {}
+    for name in ("old", "new"):
+        messages = make_messages(history_size)
+        frontend = FakeFrontend()
+        view = chat_render.ChatHistoryView()
+        # 첫 화면은 두 방식 모두 전체를 보내야 하므로 측정에서 뺍니다.
+        rerun_old(messages, frontend) if name == "old" else rerun_new(messages, frontend, view)
+        frontend.elements = frontend.sent_bytes = 0
+
+        started = time.perf_counter()
+        for i in range(reruns):
+            messages.append({"role": "user", "content": f"{i % 10}s 0b"})
+            rerun_old(messages, frontend) if name == "old" else rerun_new(messages, frontend, view)
+        elapsed = time.perf_counter() - started
+
+        results[name] = (elapsed / reruns * 1000, frontend.elements / reruns, frontend.sent_bytes / reruns)
+    return results
+
+
+def main():
+    print(f"{'기록 수':>7} | {'예전 ms/rerun':>13} {'요소':>6} {'전송 B':>8} | {'누적 ms/rerun':>13} {'요소':>6} {'전송 B':>8}")
+    for size in (10, 100, 500, 1000, 2000, 5000):
+        r = measure(size)
+        print(f"{size:>7} | {r['old'][0]:>13.3f} {r['old'][1]:>6.0f} {r['old'][2]:>8.0f} "
+              f"| {r['new'][0]:>13.3f} {r['new'][1]:>6.0f} {r['new'][2]:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
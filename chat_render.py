@@ -0,0 +1,77 @@
+"""
+채팅 말풍선 HTML을 누적해서 만드는 렌더러
+
+예전에는 rerun마다 st.session_state.messages 전체를 돌며 메시지 하나당 st.markdown을 하나씩 만들었습니다.
+기록이 길어질수록 rerun이 느려지므로, 여기서는
+- 메시지 HTML은 처음 한 번만 만들고 (이후 rerun에서는 새 메시지만 추가)
+- 말풍선을 CHUNK_BYTES 크기만큼 묶어 하나의 st.markdown 요소로 보내며
+- 기본으로는 최근 VISIBLE_BLOCKS개 묶음만 그립니다. (그 이전 기록은 사용자가 펼칠 때만)
+다 찬 묶음(frozen)은 내용이 바뀌지 않아 Streamlit 메시지 캐시에 걸리므로 브라우저로 다시 전송되지 않고,
+rerun마다 새로 만드는 것은 마지막 묶음(tail) 하나뿐입니다. 기록이 아무리 길어도 rerun 비용이 일정합니다.
+"""
+
+# Streamlit은 global.minCachedMessageSize(기본 10KB) 이상인 요소만 브라우저 캐시로 재사용하므로
+# 다 찬 묶음이 그보다 커지도록 잡습니다.
+CHUNK_BYTES = 12 * 1024
+VISIBLE_BLOCKS = 3   # 기본으로 그리는 최근 묶음 수
+
+
+def bubble_html(message: dict) -> str:
+    """메시지 하나의 말풍선 HTML (user: 오른쪽 노란색, assistant: 왼쪽 회색)"""
+    # 메시지 안의 빈 줄/마크다운(**굵게**)이 예전과 똑같이 그려지도록 줄 구성은 예전 HTML과 같게 둡니다.
+    side = "user" if message["role"] == "user" else "bot"
+    return (f'<div class="message-row {side}-row">\n'
+            f'    <div class="{side}-bubble">{message["content"]}</div>\n'
+            f'</div>\n')
+
+
+class ChatHistoryView:
+    """
+    messages 리스트를 따라가며 말풍선 HTML을 묶음 단위로 쌓아 둡니다. (st.session_state에 저장해서 사용)
+    """
+
+    def __init__(self, chunk_bytes: int = CHUNK_BYTES):
+        self.chunk_bytes = chunk_bytes
+        self.reset()
+
+    def reset(self):
+        self.frozen = []        # 다 찬 묶음들 [(HTML, 메시지 수)] (바뀌지 않음)
+        self.tail = []          # 아직 덜 찬 마지막 묶음의 말풍선 HTML들
+        self.tail_bytes = 0
+        self.count = 0          # 지금까지 반영한 메시지 수
+
+    def sync(self, messages: list) -> int:
+        """아직 반영하지 않은 메시지만 추가합니다. 새로 추가된 메시지 수를 반환합니다."""
+        if len(messages) < self.count:
+            # 기록이 초기화된 경우 (새 게임)
+            self.reset()
+
+        new_messages = messages[self.count:]
+        for message in new_messages:
+            html = bubble_html(message)
+            self.tail.append(html)
+            self.tail_bytes += len(html.encode())
+            if self.tail_bytes >= self.chunk_bytes:
+                self.frozen.append(("\n".join(self.tail), len(self.tail)))
+                self.tail = []
+                self.tail_bytes = 0
+        self.count = len(messages)
+        return len(new_messages)
+
+    def blocks(self, limit: int = None) -> list[str]:
+        """
+        화면에 그릴 HTML 묶음들 (최근 limit개, None이면 전체).
+        마지막 묶음을 제외하면 rerun 사이에 내용이 바뀌지 않습니다.
+        """
+        blocks = [html for html, _ in self.frozen]
+        if self.tail:
+            blocks.append("\n".join(self.tail))
+        if limit is not None:
+            blocks = blocks[max(0, len(blocks) - limit):]
+        return blocks
+
+    def hidden_count(self, limit: int) -> int:
+        """blocks(limit)로 그리면 화면에서 빠지는 (오래된) 메시지 수"""
+        shown_frozen = max(0, limit - (1 if self.tail else 0))
+        hidden = self.frozen[:max(0, len(self.frozen) - shown_frozen)]
+        return sum(count for _, count in hidden)
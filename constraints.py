@@ -0,0 +1,87 @@
+"""
+(추측, S, B) 기록과 모순되지 않는 숫자만 만드는 백트래킹 생성기
+
+generate_all_candidates + filter_candidates는 nPk개를 전부 만든 뒤 대부분을 버립니다.
+기록만 알고 상태를 다시 만들 때(DEFENSE 복원, 배치 요청, 8~9자리 게임의 몇 턴 뒤)는
+자리마다 기호를 하나씩 놓으면서 기록마다 '지금까지의 S / 공통 숫자 수'가 아직 맞출 수 있는지 확인하고,
+맞출 수 없으면 그 가지 전체를 버립니다. 비용이 nPk가 아니라 살아남는 숫자 수에 비례합니다.
+
+미리 걸러 두는 제약:
+- 자리별 금지 기호: S = 0인 추측의 g[i]는 i번째 자리에 올 수 없음
+- 빠진 기호: S + B = 0인 추측의 기호는 어디에도 올 수 없음
+결과는 itertools.permutations(digits, level) 순서(= level_tables(...).numbers 순서)로 하나씩 나옵니다.
+"""
+
+
+def consistent_numbers(digits: str, level: int, history):
+    """history [(추측, S, B), ...]와 모순되지 않는 level자리 숫자를 차례로 내보냅니다. (제너레이터)"""
+    history = [(guess, int(s), int(b)) for guess, s, b in history]
+
+    excluded = set()
+    forbidden = [set() for _ in range(level)]
+    for guess, s, b in history:
+        if s + b == 0:
+            excluded.update(guess)
+        if s == 0:
+            for pos, ch in enumerate(guess):
+                forbidden[pos].add(ch)
+    allowed = [[ch for ch in digits if ch not in excluded and ch not in forbidden[pos]] for pos in range(level)]
+
+    guesses = [guess for guess, _, _ in history]
+    guess_sets = [set(guess) for guess in guesses]
+    targets_s = [s for _, s, _ in history]
+    targets_c = [s + b for _, s, b in history]
+    turns = range(len(history))
+
+    # 진행 상태: 기록마다 지금까지의 스트라이크 / 공통 숫자 수
+    strikes = [0] * len(history)
+    commons = [0] * len(history)
+    used = set()
+    number = []
+
+    def feasible(pos):
+        """pos번째 자리까지 채웠을 때 모든 기록의 S / S+B를 아직 맞출 수 있는지"""
+        remaining = level - pos - 1
+        for t in turns:
+            s = strikes[t]
+            if s > targets_s[t]:
+                return False
+            c = commons[t]
+            if c > targets_c[t]:
+                return False
+            guess = guesses[t]
+            # 남은 자리에서 더 얻을 수 있는 스트라이크: 그 자리의 추측 기호가 아직 안 쓰였으면 가능
+            if s + sum(1 for p in range(pos + 1, level) if guess[p] not in used) < targets_s[t]:
+                return False
+            # 남은 자리에서 더 얻을 수 있는 공통 숫자: 아직 안 쓴 추측 기호 수와 남은 자리 수 중 작은 쪽
+            if c + min(remaining, len(guess_sets[t] - used)) < targets_c[t]:
+                return False
+        return True
+
+    def place(pos):
+        if pos == level:
+            yield "".join(number)
+            return
+        for ch in allowed[pos]:
+            if ch in used:
+                continue
+            for t in turns:
+                if guesses[t][pos] == ch:
+                    strikes[t] += 1
+                if ch in guess_sets[t]:
+                    commons[t] += 1
+            used.add(ch)
+            number.append(ch)
+
+            if feasible(pos):
+                yield from place(pos + 1)
+
+            number.pop()
+            used.discard(ch)
+            for t in turns:
+                if guesses[t][pos] == ch:
+                    strikes[t] -= 1
+                if ch in guess_sets[t]:
+                    commons[t] -= 1
+
+    yield from place(0)
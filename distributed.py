@@ -0,0 +1,456 @@
+"""
+여러 머신에 미니맥스 계산을 나눠 맡기는 코디네이터 / 워커 (전략 트리 오프라인 계산용)
+
+한 노드의 '다음 추측' 계산(모든 추측 x 남은 후보)을 추측 인덱스 구간(shard)으로 잘라,
+코디네이터가 워커들에게 하나씩 빌려 줍니다. (multiprocessing.managers, TCP)
+- 워커는 구간 하나를 빌려(lease) backends._process_shard(vector 커널)로 계산하고 결과를 돌려줍니다.
+  계산하는 동안 heartbeat로 임대 기간을 늘립니다.
+- 임대 기간 안에 결과도 heartbeat도 없으면 워커가 죽은 것으로 보고 그 구간을 다른 워커에게 다시 줍니다.
+  (늦게 도착한 중복 결과는 버림 - 같은 구간은 어느 워커가 계산해도 결과가 같음)
+- 구간별 결과는 구간 순서대로 backends._merge로 합치므로, 워커 수나 도착 순서와 상관없이
+  한 프로세스에서 전체를 계산한 것과 항상 같은 추측이 나옵니다.
+
+managers는 pickle로 통신하므로 포트에 접근해 authkey를 아는 쪽은 코디네이터에서 임의의 코드를 실행할 수 있습니다.
+그래서 기본 주소는 127.0.0.1이고, authkey는 기본값 없이 --authkey나 NBB_AUTHKEY로 반드시 정해야 합니다.
+다른 머신의 워커를 붙일 때는 믿을 수 있는 네트워크의 주소로만 --bind 하세요.
+
+사용법:
+    python distributed.py coordinator --bind 10.0.0.5:50000 --authkey secret
+    python distributed.py worker --connect coord-host:50000 --authkey secret --processes 8   # 머신마다
+    python strategy_tree.py build --level 5 --coordinator coord-host:50000 --authkey secret
+    python distributed.py selftest --workers 3 --level 4   # localhost: 워커 하나를 중간에 죽여도 결과가 같은지 검증
+"""
+
+import argparse
+import collections
+import itertools
+import math
+import multiprocessing
+import os
+import random
+import secrets
+import socket
+import threading
+import time
+from multiprocessing.managers import BaseManager
+
+import backends
+
+
+LEASE_SECONDS = 30.0        # 이 시간 동안 결과도 heartbeat도 없으면 구간을 다시 나눠 줌
+SHARD_OPS = 5_000_000       # 구간 하나의 연산량 (추측 수 x 후보 수) 목표
+POLL_INTERVAL = 0.05        # 클라이언트가 결과를 확인하는 주기 / 워커가 일이 없을 때 쉬는 시간의 기본값
+WORKER_TIMEOUT_LEASES = 3   # 임대 시간의 이 배수만큼 어떤 워커도 연락이 없으면 클라이언트가 기다리기를 포기
+DEFAULT_BIND = "127.0.0.1:50000"
+
+
+def resolve_authkey(authkey: str = None) -> str:
+    """--authkey 값, 없으면 NBB_AUTHKEY. 둘 다 없으면 ValueError (알려진 기본 키로는 열지 않음)"""
+    authkey = authkey or os.environ.get("NBB_AUTHKEY")
+    if not authkey:
+        raise ValueError("authkey가 없습니다. --authkey 또는 환경 변수 NBB_AUTHKEY로 정하세요.")
+    return authkey
+
+
+# --- 코디네이터 (서버 쪽 상태) ---
+
+class Coordinator:
+    """
+    작업(노드 하나의 미니맥스)과 구간 임대를 관리합니다. 매니저 서버 안에서 여러 연결이 동시에 부르므로 잠금으로 보호합니다.
+    작업: {job_id: {"spec": (digits, level, alive_bitmap), "shards": [(start, stop), ...], "results": {shard: 결과}}}
+    """
+
+    def __init__(self, lease_seconds: float = LEASE_SECONDS):
+        self._lease_seconds = lease_seconds
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._pending = collections.deque()     # (job_id, shard)
+        self._leases = {}                       # (job_id, shard) -> [worker_id, 만료 시각]
+        self._next_job = itertools.count()
+        self._workers = {}                      # worker_id -> 마지막 연락 시각
+        self._reissued = 0
+        self._closing = False
+
+    def lease_seconds(self) -> float:
+        return self._lease_seconds
+
+    def submit(self, digits: str, level: int, alive_bitmap: int, guess_count: int, shard_size: int) -> int:
+        """추측 인덱스 range(guess_count)를 shard_size씩 자른 작업을 등록하고 job_id를 돌려줍니다."""
+        shards = [(start, min(start + shard_size, guess_count)) for start in range(0, guess_count, shard_size)]
+        with self._lock:
+            job_id = next(self._next_job)
+            self._jobs[job_id] = {"spec": (digits, level, alive_bitmap), "shards": shards, "results": {}}
+            self._pending.extend((job_id, shard) for shard in range(len(shards)))
+        return job_id
+
+    def lease(self, worker_id: str):
+        """
+        구간 하나를 빌려줍니다: (job_id, shard, digits, level, alive_bitmap, start, stop) / 일이 없으면 None
+        만료된 임대는 여기서 다시 대기열 맨 앞에 넣습니다. (앞선 작업부터 끝나도록)
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._workers[worker_id] = now
+            for key, (_, deadline) in list(self._leases.items()):
+                if deadline < now:
+                    del self._leases[key]
+                    self._pending.appendleft(key)
+                    self._reissued += 1
+
+            while self._pending:
+                job_id, shard = self._pending.popleft()
+                job = self._jobs.get(job_id)
+                if job is None or shard in job["results"]:
+                    continue    # 취소된 작업이거나 (다시 나눠 준 사이에) 이미 끝난 구간
+                self._leases[(job_id, shard)] = [worker_id, now + self._lease_seconds]
+                digits, level, alive_bitmap = job["spec"]
+                start, stop = job["shards"][shard]
+                return job_id, shard, digits, level, alive_bitmap, start, stop
+        return None
+
+    def heartbeat(self, worker_id: str):
+        """worker_id가 빌려 간 구간들의 임대 기간을 늘립니다."""
+        now = time.monotonic()
+        with self._lock:
+            self._workers[worker_id] = now
+            for lease in self._leases.values():
+                if lease[0] == worker_id:
+                    lease[1] = now + self._lease_seconds
+
+    def complete(self, worker_id: str, job_id: int, shard: int, result):
+        """구간 결과 (worst, guess_index, is_candidate)를 받습니다. 먼저 도착한 결과만 씁니다."""
+        with self._lock:
+            self._workers[worker_id] = time.monotonic()
+            self._leases.pop((job_id, shard), None)
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job["results"].setdefault(shard, tuple(result))
+
+    def result(self, job_id: int):
+        """작업이 끝났으면 구간 순서대로 합친 (worst, guess_index, is_candidate)를 돌려주고 작업을 지웁니다. (아니면 None)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                raise KeyError(f"알 수 없는 작업입니다: {job_id}")
+            if len(job["results"]) < len(job["shards"]):
+                return None
+            del self._jobs[job_id]
+            return backends._merge(job["results"][shard] for shard in range(len(job["shards"])))
+
+    def cancel(self, job_id: int):
+        with self._lock:
+            self._jobs.pop(job_id, None)
+            for key in [key for key in self._leases if key[0] == job_id]:
+                del self._leases[key]
+
+    def close(self):
+        """워커들에게 종료를 알립니다. (다음 is_closing 확인 때 빠져나감)"""
+        self._closing = True
+
+    def is_closing(self) -> bool:
+        return self._closing
+
+    def status(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "jobs": len(self._jobs),
+                "pending_shards": len(self._pending),
+                "leased_shards": len(self._leases),
+                "leases_by_worker": dict(collections.Counter(worker for worker, _ in self._leases.values())),
+                "reissued_shards": self._reissued,
+                "workers": {worker: round(now - seen, 1) for worker, seen in self._workers.items()},
+            }
+
+
+_coordinator = None
+
+
+def _get_coordinator():
+    return _coordinator
+
+
+class CoordinatorManager(BaseManager):
+    pass
+
+
+CoordinatorManager.register("coordinator", callable=_get_coordinator)
+
+
+def parse_address(text: str) -> tuple[str, int]:
+    host, _, port = text.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def start_coordinator(address, authkey: str, lease_seconds: float = LEASE_SECONDS):
+    """
+    이 프로세스의 백그라운드 스레드에서 코디네이터 서버를 띄웁니다. 반환값: (실제 주소, Coordinator)
+    포트를 0으로 주면 빈 포트를 고릅니다.
+    """
+    global _coordinator
+    _coordinator = Coordinator(lease_seconds)
+    manager = CoordinatorManager(address=address, authkey=resolve_authkey(authkey).encode())
+    server = manager.get_server()
+    threading.Thread(target=server.serve_forever, name="coordinator", daemon=True).start()
+    return server.address, _coordinator
+
+
+def connect(address, authkey: str):
+    """코디네이터 프록시 (워커/클라이언트용)"""
+    manager = CoordinatorManager(address=address, authkey=resolve_authkey(authkey).encode())
+    manager.connect()
+    return manager.coordinator()
+
+
+# --- 워커 ---
+
+def run_worker(address, authkey: str, worker_id: str = None, log=None):
+    """
+    코디네이터가 닫히거나 연결이 끊길 때까지 구간을 빌려 계산합니다.
+    계산하는 동안 별도 스레드에서 heartbeat를 보내 임대가 만료되지 않게 합니다.
+    """
+    coordinator = connect(address, authkey)
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    interval = coordinator.lease_seconds() / 3
+    stopped = threading.Event()
+
+    def send_heartbeats():
+        while not stopped.wait(interval):
+            try:
+                coordinator.heartbeat(worker_id)
+            except (OSError, EOFError):
+                return
+
+    threading.Thread(target=send_heartbeats, name="heartbeat", daemon=True).start()
+    done = 0
+    try:
+        while not coordinator.is_closing():
+            task = coordinator.lease(worker_id)
+            if task is None:
+                time.sleep(POLL_INTERVAL)
+                continue
+            job_id, shard, digits, level, alive_bitmap, start, stop = task
+            result = backends._process_shard(digits, level, alive_bitmap, range(start, stop))
+            coordinator.complete(worker_id, job_id, shard, result)
+            done += 1
+    except (OSError, EOFError):
+        pass    # 코디네이터가 내려감
+    finally:
+        stopped.set()
+        if log:
+            log(f"워커 {worker_id} 종료 (구간 {done}개 계산)")
+    return done
+
+
+# --- 클라이언트 ---
+
+class DistributedSearch:
+    """코디네이터에 노드를 맡기고 결과를 받아 오는 쪽 (전략 트리 빌더 등)"""
+
+    def __init__(self, address, authkey: str, shard_ops: int = SHARD_OPS):
+        self.coordinator = connect(address, authkey)
+        self.shard_ops = shard_ops
+        # 살아 있는 워커가 없으면 구간을 다시 나눠 줄 쪽도 없으므로, 그때는 영원히 기다리지 않고 오류를 냅니다.
+        self.worker_timeout = self.coordinator.lease_seconds() * WORKER_TIMEOUT_LEASES
+        self._last_check = 0.0
+
+    def _check_workers(self, waiting_since: float):
+        """waiting_since부터 worker_timeout 넘게 기다렸는데 그동안 연락한 워커가 하나도 없으면 RuntimeError"""
+        now = time.monotonic()
+        if now - waiting_since < self.worker_timeout or now - self._last_check < 1.0:
+            return
+        self._last_check = now
+        ages = self.coordinator.status()["workers"].values()
+        if not any(age < self.worker_timeout for age in ages):
+            raise RuntimeError(f"{self.worker_timeout:.0f}초 동안 연락한 워커가 없습니다."
+                               f" (접속했던 워커 {len(ages)}개) 워커를 띄운 뒤 다시 실행하세요.")
+
+    def submit(self, digits: str, level: int, candidates) -> int:
+        import partition
+        from state import indices_to_bitmap
+
+        alive = indices_to_bitmap(partition.index_of(digits, level, number) for number in candidates)
+        guess_count = math.perm(len(digits), level)
+        shard_size = min(guess_count, max(1, self.shard_ops // max(1, len(candidates))))
+        return self.coordinator.submit(digits, level, alive, guess_count, shard_size)
+
+    def wait(self, job_id: int, stop_callback=None):
+        """결과 (worst, guess_index, is_candidate)가 나올 때까지 기다립니다. (살아 있는 워커가 없으면 RuntimeError)"""
+        waiting_since = time.monotonic()
+        while True:
+            result = self.coordinator.result(job_id)
+            if result is not None:
+                return result
+            if stop_callback and stop_callback():
+                self.coordinator.cancel(job_id)
+                raise InterruptedError("Game Stopped by User")
+            try:
+                self._check_workers(waiting_since)
+            except RuntimeError:
+                self.coordinator.cancel(job_id)
+                raise
+            time.sleep(POLL_INTERVAL)
+
+    def find_best_guess(self, digits: str, level: int, candidates, stop_callback=None) -> str:
+        """backends.find_best_guess(guesses=None)와 같은 추측을 돌려줍니다."""
+        import partition
+
+        result = self.wait(self.submit(digits, level, candidates), stop_callback)
+        return partition.number_at(digits, level, result[1])
+
+    def imap_nodes(self, jobs, digits: str, max_pending: int = 64):
+        """
+        digits 기호 집합의 [(path, level, candidates), ...]를 동시에 max_pending개까지 맡기고,
+        끝나는 대로 (path, guess)를 내보냅니다.
+        (strategy_tree의 pool.imap_unordered(_build_node, jobs) 대신 쓸 수 있음)
+        마지막 결과 뒤로 worker_timeout 넘게 연락한 워커가 없으면 남은 작업을 취소하고 RuntimeError를 냅니다.
+        """
+        import partition
+
+        jobs = iter(jobs)
+        pending = {}    # job_id -> (path, level)
+        waiting_since = time.monotonic()
+        while True:
+            while len(pending) < max_pending:
+                job = next(jobs, None)
+                if job is None:
+                    break
+                path, level, candidates = job
+                pending[self.submit(digits, level, candidates)] = (path, level)
+            if not pending:
+                return
+
+            finished = False
+            for job_id, (path, level) in list(pending.items()):
+                result = self.coordinator.result(job_id)
+                if result is not None:
+                    del pending[job_id]
+                    finished = True
+                    yield path, partition.number_at(digits, level, result[1])
+            if finished:
+                waiting_since = time.monotonic()
+                continue
+            try:
+                self._check_workers(waiting_since)
+            except RuntimeError:
+                for job_id in pending:
+                    self.coordinator.cancel(job_id)
+                raise
+            time.sleep(POLL_INTERVAL)
+
+
+# --- localhost 자체 검증 ---
+
+def _random_state(game_class, level: int, rng):
+    """첫 추측 + 무작위 추측 0~2개 뒤의 후보 목록"""
+    game = game_class(n=level, backend="vector")
+    game.generate_all_candidates()
+    secret = "".join(rng.sample(game.DIGITS, level))
+    guess = game.DIGITS[:level]
+    for _ in range(rng.randint(1, 3)):
+        game.apply_feedback(guess, *game.check_sb(guess, secret))
+        guess = "".join(rng.sample(game.DIGITS, level))
+    return game.candidates
+
+
+def selftest(workers: int = 3, level: int = 4, states: int = 10, lease_seconds: float = 1.0,
+             seed: int = 0, log=print) -> bool:
+    """
+    localhost에 코디네이터와 워커 프로세스 workers개를 띄워 무작위 상태 states개를 계산하고,
+    첫 워커가 구간을 빌려 간 순간 그 워커를 강제로 죽입니다. (그 구간은 임대 만료 뒤 다른 워커가 계산)
+    모든 결과가 한 프로세스 계산(vector)과 같으면 True.
+    """
+    from game import NumberBaseballGame
+
+    authkey = secrets.token_hex(16)     # 이번 검증에서만 쓰는 키
+    address, coordinator = start_coordinator(("127.0.0.1", 0), authkey, lease_seconds)
+    processes = [multiprocessing.Process(target=run_worker, args=(address, authkey), daemon=True)
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+
+    def kill_one():
+        victim = f"{socket.gethostname()}:{processes[0].pid}"
+        while victim not in coordinator.status()["leases_by_worker"]:
+            time.sleep(0.001)
+        processes[0].kill()
+        log(f"구간을 빌려 간 워커 pid={processes[0].pid}를 강제로 종료했습니다.")
+
+    if workers > 1:
+        threading.Thread(target=kill_one, daemon=True).start()
+    search = DistributedSearch(address, authkey, shard_ops=100_000)
+    rng = random.Random(seed)
+    matches = 0
+    started = time.perf_counter()
+    try:
+        for i in range(states):
+            candidates = _random_state(NumberBaseballGame, level, rng)
+            remote = search.find_best_guess(NumberBaseballGame.DIGITS, level, candidates)
+            local, _ = backends.find_best_guess(NumberBaseballGame.DIGITS, level, candidates, backend="vector")
+            matches += remote == local
+            log(f"[{i + 1}/{states}] 후보 {len(candidates)}개: 분산 {remote} / 로컬 {local}"
+                f" {'OK' if remote == local else 'MISMATCH'}")
+    finally:
+        status = coordinator.status()
+        coordinator.close()
+        for process in processes:
+            process.join(timeout=5)
+
+    log(f"일치 {matches}/{states}, 다시 나눠 준 구간 {status['reissued_shards']}개,"
+        f" 워커 {len(status['workers'])}개, {time.perf_counter() - started:.1f}초")
+    return matches == states
+
+
+def main():
+    parser = argparse.ArgumentParser(description="숫자야구 미니맥스 분산 계산 (코디네이터 / 워커)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_coord = sub.add_parser("coordinator", help="코디네이터 서버 실행")
+    p_coord.add_argument("--bind", default=DEFAULT_BIND,
+                         help=f"주소:포트 (기본: {DEFAULT_BIND}, 다른 머신의 워커는 믿을 수 있는 네트워크 주소로)")
+    p_coord.add_argument("--authkey", default=None, help="인증 키 (필수, 생략하면 NBB_AUTHKEY)")
+    p_coord.add_argument("--lease", type=float, default=LEASE_SECONDS, help="구간 임대 시간 (초)")
+
+    p_worker = sub.add_parser("worker", help="워커 실행 (코디네이터가 닫힐 때까지)")
+    p_worker.add_argument("--connect", required=True, help="코디네이터 주소:포트")
+    p_worker.add_argument("--authkey", default=None, help="인증 키 (필수, 생략하면 NBB_AUTHKEY)")
+    p_worker.add_argument("--processes", type=int, default=1, help="이 머신에서 띄울 워커 프로세스 수")
+
+    p_test = sub.add_parser("selftest", help="localhost에서 워커 여러 개로 결과 일치와 워커 손실 복구를 검증")
+    p_test.add_argument("--workers", type=int, default=3)
+    p_test.add_argument("--level", type=int, default=4)
+    p_test.add_argument("--states", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.command in ("coordinator", "worker"):
+        try:
+            args.authkey = resolve_authkey(args.authkey)
+        except ValueError as exc:
+            parser.error(str(exc))
+
+    if args.command == "coordinator":
+        address, coordinator = start_coordinator(parse_address(args.bind), args.authkey, args.lease)
+        print(f"코디네이터 실행 중: {address[0]}:{address[1]} (Ctrl+C로 종료)")
+        try:
+            while True:
+                time.sleep(10)
+                print(coordinator.status())
+        except KeyboardInterrupt:
+            coordinator.close()
+            time.sleep(coordinator.lease_seconds() / 3)   # 워커들이 종료 신호를 볼 시간
+
+    elif args.command == "worker":
+        address = parse_address(args.connect)
+        processes = [multiprocessing.Process(target=run_worker, args=(address, args.authkey, None, print))
+                     for _ in range(args.processes)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+    else:
+        raise SystemExit(0 if selftest(args.workers, args.level, args.states) else 1)
+
+
+if __name__ == "__main__":
+    main()
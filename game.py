@@ -1,24 +1,422 @@
-import itertools
 import collections
+import math
+import threading
+import time
+
+import backends
+import guess_pool
+import memory
+import scheduler
+from state import GameState, encode_turn, indices_to_bitmap, bitmap_to_indices
+
+
+# 기본 전략(하드코딩 첫 추측 + 미니맥스)을 따라가며 계산한 추측을 프로세스 전체에서 공유합니다.
+# 키: (DIGITS, 자릿수, 결과 경로) -> 같은 경로라면 후보 집합도 같으므로 다음 추측도 같습니다.
+STRATEGY_CACHE_SIZE = 100_000
+_strategy_cache = collections.OrderedDict()
+_strategy_cache_lock = threading.Lock()
+
+# 기호 집합 (digits 인자). 첫 추측이 DIGITS[:n]이므로 기존처럼 1부터 시작하는 순서를 씁니다.
+ALPHABETS = {
+    "decimal": "1234567890",
+    "hex": "1234567890ABCDEF",
+}
+
+# 한 게임의 전체 숫자(nPk) 상한. 16진수 6자리(약 577만)까지 허용하고, 그 위(16진수 7자리 5,700만 ~ 9자리 41억)는
+# 비트셋 색인만 해도 GB 단위이므로 게임 생성 단계에서 막습니다.
+MAX_UNIVERSE = 6_000_000
+
+
+def max_level(digits: str) -> int:
+    """
+    기호 집합 digits에서 만들 수 있는 가장 큰 자릿수
+    전체 숫자 수가 MAX_UNIVERSE 이하이고, 전체 테이블(숫자당 memory.TABLE_BYTES_PER_NUMBER)이
+    이 머신의 기본 예산(memory.default_budget_bytes) 안에 들어가야 합니다. (16진수 6자리 테이블은 약 1.1GB)
+    """
+    budget = memory.default_budget_bytes()
+    level = 0
+    while level < len(digits):
+        if math.perm(len(digits), level + 1) > MAX_UNIVERSE:
+            break
+        if budget is not None and memory.tables_bytes(digits, level + 1) > budget:
+            break
+        level += 1
+    return level
+
 
 class NumberBaseballGame:
     
-    DIGITS = "1234567890" 
+    DIGITS = ALPHABETS["decimal"]
     
-    def __init__(self, n=4):
+    def __init__(self, n=4, backend="auto", session_id=None, guess_pool="full", digits=None):
+        if digits is not None and digits != self.DIGITS:
+            # 테이블/색인/캐시가 모두 (digits, 자릿수)를 키로 쓰므로 인스턴스 속성만 바꾸면 됩니다.
+            if len(set(digits)) != len(digits):
+                raise ValueError(f"기호 집합에 중복된 기호가 있습니다: '{digits}'")
+            self.DIGITS = digits
+        if not 1 <= n <= max_level(self.DIGITS):
+            raise ValueError(f"자릿수는 1~{max_level(self.DIGITS)} 사이여야 합니다. (기호 {len(self.DIGITS)}개, 입력: {n})")
         self.scale = n
+        self.backend = backend      # 미니맥스 계산 백엔드: auto / serial / vector / thread / process
+        self.guess_pool = guess_pool  # 추측 집합: full(전체) / reduced(후보 + 분리용 추측) / auto(후반 턴만 reduced)
+        self.verify_guess_pool = False  # reduced로 고른 추측을 전체 탐색과 비교해 last_search에 기록
+        self.session_id = session_id if session_id is not None else id(self)  # 스케줄러 공정성 단위
+        self.last_search = None     # 마지막 find_next_best_guess 계산 정보 (백엔드, 연산량, 소요 시간)
+        self.memory_mode = "full"   # 메모리 예산에 따른 모드: full / compact / sampled (memory 모듈)
         self.candidates = []
         self.all_possible_numbers = []
+        self.strategy_tree = None   # 미리 계산된 전략 트리 {path: guess} (load_strategy_tree)
+        self.strategy_tree_file = None
+        self.tree_path = None       # 기본 전략(트리/공유 캐시)에서의 현재 위치 (전략을 벗어나면 None)
+        self.history = []           # [(추측, S, B), ...] (apply_feedback으로 쌓임)
+        self.evil_host = False      # ATTACK '악마 호스트' 모드: 정답을 정하지 않고 가장 큰 그룹으로 답함
+        self.alive_bitmap = None    # ATTACK에서 아직 가능한 정답들의 비트맵 (partition 모듈 기준, track_alive)
+        self._last_partition = None # (alive_bitmap, 추측, 분할 결과) 마지막 분할 하나
+        self._best_for_alive = None # (alive_bitmap, 엔진 최선 추측, 최선임이 확실한지)
+        self._best_job = None       # (alive_bitmap, 최선 추측을 계산 중인 스케줄러 작업)
+
+        # app.py가 게임 진행에 쓰는 값들
+        self.last_guess = None
+        self.guess_count = 0
+        self.secret_answer = None
         
     
     def generate_all_candidates(self) -> list[str]:
         """게임 시작 시, 가능한 모든 후보(5040개)를 생성합니다."""
         # 0~9의 숫자 중 4개를 순서대로 나열하는 모든 경우의 수
-        all_permutations = itertools.permutations(self.DIGITS, self.scale)
-        # ("0", "1", "2", "3") -> "0123" 형태로 변환
-        self.candidates = ["".join(p) for p in all_permutations]
-        
-        self.all_possible_numbers = self.candidates[:]
+        # 레벨별 전체 목록은 프로세스 안에서 한 번만 만들어 모든 게임이 함께 씁니다.
+        # 메모리 예산(NBB_MEMORY_BUDGET_MB)이 모자라면 후보를 비트맵으로만 들고 갑니다. (compact / sampled)
+        self.memory_mode = memory.plan_game(self.DIGITS, self.scale)
+        memory.register_game(self)
+        self.history = []
+        self.tree_path = ""
+
+        if self.memory_mode == "full":
+            tables = backends.level_tables(self.DIGITS, self.scale)
+            self.candidates = list(tables.numbers)
+            self.all_possible_numbers = tables.numbers
+            self.alive_bitmap = None
+        else:
+            import partition
+
+            # sampled는 전체 테이블도 만들지 않습니다. (숫자는 인덱스에서 바로 계산)
+            numbers = backends.level_tables(self.DIGITS, self.scale).numbers if self.memory_mode == "compact" else None
+            self.alive_bitmap = partition.bitset_index(self.DIGITS, self.scale).full
+            self.candidates = partition.AliveCandidates(self.DIGITS, self.scale, self.alive_bitmap, numbers)
+            self.all_possible_numbers = numbers if numbers is not None else ()
+
+    def load_history(self, history):
+        """
+        (추측, S, B) 기록에서 바로 게임 상태를 만듭니다. (DEFENSE 복원, 배치 요청 등)
+        generate_all_candidates 후 턴마다 거르는 대신, 기록과 모순되지 않는 숫자만 백트래킹으로 만듭니다. (constraints 모듈)
+        """
+        import constraints
+
+        history = [(guess, int(s), int(b)) for guess, s, b in history]
+        if not history:
+            self.generate_all_candidates()
+            return
+
+        self.memory_mode = memory.plan_game(self.DIGITS, self.scale)
+        memory.register_game(self)
+        survivors = constraints.consistent_numbers(self.DIGITS, self.scale, history)
+        if self.memory_mode == "full":
+            self.candidates = list(survivors)
+            # 전체 테이블은 실제로 미니맥스를 돌릴 때 만듭니다. (_search_job, 남은 후보가 적으면 필요 없음)
+            self.all_possible_numbers = None
+            self.alive_bitmap = None
+        else:
+            import partition
+
+            numbers = backends.level_tables(self.DIGITS, self.scale).numbers if self.memory_mode == "compact" else None
+            self.alive_bitmap = indices_to_bitmap(partition.index_of(self.DIGITS, self.scale, number)
+                                                  for number in survivors)
+            self.candidates = partition.AliveCandidates(self.DIGITS, self.scale, self.alive_bitmap, numbers)
+            self.all_possible_numbers = numbers if numbers is not None else ()
+
+        self.history = []
+        self.tree_path = ""
+        for guess, s, b in history:
+            self.history.append((guess, s, b))
+            self._advance_tree(guess, s, b)
+
+    def memory_notice(self):
+        """full이 아닌 모드로 시작했을 때 사용자에게 보여 줄 안내 (full이면 None)"""
+        if self.memory_mode == "compact":
+            return "💾 서버 메모리 절약을 위해 후보를 압축해서 계산합니다. (결과는 같음)"
+        if self.memory_mode == "sampled":
+            return "💾 서버 메모리가 부족해 표본 계산으로 진행합니다. (추측 횟수가 조금 늘 수 있음)"
+        return None
+
+    def load_strategy_tree(self, path: str):
+        """
+        strategy_tree.py로 미리 만든 전략 트리를 불러옵니다.
+        트리가 다루는 상태에서는 find_next_best_guess가 계산 없이 O(1)로 추측을 꺼냅니다.
+        """
+        import strategy_tree
+
+        tree = strategy_tree.load_tree(path)
+        if tree["level"] != self.scale or tree["digits"] != self.DIGITS:
+            raise ValueError(f"전략 트리 설정 불일치: 트리는 {tree['level']}자리 (기호 {tree['digits']!r}), "
+                             f"게임은 {self.scale}자리 (기호 {self.DIGITS!r})입니다.")
+        self.strategy_tree = tree["nodes"]
+        self.strategy_tree_file = path
+
+    # --- ATTACK: 가능한 정답 추적 / 악마 호스트 / 추측 분석 ---
+    # ATTACK에서는 후보를 문자열 리스트 대신 비트맵(alive_bitmap) 하나로 들고, partition 모듈로 한 번에 나눕니다.
+
+    def track_alive(self):
+        """ATTACK 시작: 가능한 정답 전체로 alive_bitmap을 만들고, 엔진 최선 추측을 미리 계산해 둡니다."""
+        import partition
+
+        self.history = []
+        self.tree_path = None
+        self.alive_bitmap = partition.bitset_index(self.DIGITS, self.scale).full
+        self._last_partition = None
+        self._best_for_alive = None
+        self._best_job = None
+        self.prefetch_best_guess()
+
+    def start_evil_host(self):
+        """
+        정답을 미리 정하지 않는 ATTACK 모드를 시작합니다.
+        플레이어가 추측할 때마다 아직 가능한 정답들을 (S, B)별로 나눠, 가장 많이 남는 쪽으로 대답합니다.
+        """
+        self.evil_host = True
+        self.secret_answer = None
+        self.track_alive()
+
+    def _partition(self, guess: str) -> dict[tuple[int, int], int]:
+        """지금 alive_bitmap을 guess로 나눈 결과 (같은 턴에 분석과 판정이 같은 결과를 다시 쓰도록 하나만 기억)"""
+        import partition
+
+        if self._last_partition is not None:
+            alive, cached_guess, buckets = self._last_partition
+            if alive == self.alive_bitmap and cached_guess == guess:
+                return buckets
+        buckets = partition.partition_bitmap(self.DIGITS, self.scale, self.alive_bitmap, guess)
+        self._last_partition = (self.alive_bitmap, guess, buckets)
+        return buckets
+
+    def narrow_alive(self, guess: str, s_result: int, b_result: int):
+        """받은(또는 호스트가 고른) S/B로 alive_bitmap을 줄이고, 다음 상태의 최선 추측 계산을 걸어 둡니다."""
+        self.alive_bitmap = self._partition(guess).get((s_result, b_result), 0)
+        self.history.append((guess, s_result, b_result))
+        self.prefetch_best_guess()
+
+    def evil_host_response(self, guess: str) -> tuple[int, int]:
+        """
+        guess에 대한 (S, B)를 고르고 가능한 정답 집합을 그 그룹으로 줄입니다.
+        그룹 크기가 같으면 정답(nS 0B)이 아닌 쪽, 그다음 S, B가 작은 쪽을 고릅니다. (항상 같은 대답)
+        더 이상 피할 수 없으면(남은 정답이 guess 하나뿐) 정답 판정을 돌려줍니다.
+        """
+        (s, b), _ = max(
+            self._partition(guess).items(),
+            key=lambda item: (item[1].bit_count(), item[0][0] != self.scale, -item[0][0], -item[0][1]),
+        )
+        self.narrow_alive(guess, s, b)
+        if s == self.scale:
+            self.secret_answer = guess
+        return s, b
+
+    def prefetch_best_guess(self):
+        """
+        지금 alive_bitmap에 대한 엔진의 최선 추측을 스케줄러에서 백그라운드로 계산합니다.
+        기다리지 않고 바로 돌아오며, 결과는 guess_quality가 준비됐을 때만 씁니다.
+        상태가 바뀌면 이전 상태의 계산은 취소합니다.
+        분석용이므로 전체 숫자 미니맥스는 돌리지 않습니다.
+        - 플레이어가 기본 전략대로 추측해 왔고 그 위치를 알면(전략 트리 / 공유 캐시) 계산 없이 그 추측
+        - 아니면 기호 대칭 대표만 검사(전체 탐색과 같은 결과), 대칭이 없으면 축소 추측 집합(guess_pool)에서 고름
+        """
+        alive = self.alive_bitmap
+        if self._best_for_alive is not None and self._best_for_alive[0] == alive:
+            return
+        if self._best_job is not None:
+            if self._best_job[0] == alive:
+                return
+            scheduler.get_scheduler().cancel(self._best_job[1])
+            self._best_job = None
+
+        import partition
+
+        universe = partition.bitset_index(self.DIGITS, self.scale).size
+        count = alive.bit_count()
+        if count == universe:
+            # 첫 추측은 엔진도 하드코딩된 값을 씁니다.
+            self._best_for_alive = (alive, self.DIGITS[:self.scale], True)
+            return
+        if count <= 2:
+            # find_next_best_guess와 같은 규칙 (계산 없이 첫 번째 후보)
+            self._best_for_alive = (alive, partition.AliveCandidates(self.DIGITS, self.scale, alive)[0], True) if count else None
+            return
+
+        path = self._strategy_path()
+        known_guess = self._strategy_guess(path) if path is not None else None
+        if known_guess is not None:
+            self._best_for_alive = (alive, known_guess, True)
+            return
+        if not memory.turn_fits(count):
+            # 메모리 예산을 넘는 계산은 분석용으로 돌리지 않습니다. (비교 없이 남은 정답 수만 보여 줌)
+            return
+
+        digits, scale, backend = self.DIGITS, self.scale, self.backend
+
+        def compute(should_stop):
+            candidates = list(partition.AliveCandidates(digits, scale, alive))
+            blocks = guess_pool.symmetry_blocks(digits, scale, candidates)
+            if blocks:
+                firsts, lasts = guess_pool.symmetric_guesses(digits, scale, blocks)
+                guess, _ = guess_pool.best_symmetric_guess(digits, scale, candidates, firsts, lasts,
+                                                           backend=backend, stop_callback=should_stop)
+                if path:
+                    # 전체 탐색과 같은 결과이므로 기본 전략 위치라면 다른 게임도 쓰도록 남깁니다.
+                    self._remember_strategy_guess(path, guess)
+                return guess, True
+            # 축소 집합의 최선은 휴리스틱이므로, 최악의 경우가 하한에 닿을 때만 최선이라고 봅니다.
+            pool = guess_pool.reduced_pool(digits, scale, candidates)
+            guess, _ = backends.find_best_guess(digits, scale, candidates, pool,
+                                                backend="vector", stop_callback=should_stop)
+            return guess, guess_pool.worst_case(guess, candidates) <= guess_pool.worst_case_lower_bound(scale, count)
+
+        # 대표 / 축소 집합은 대략 후보 수 정도이므로 후보 수의 제곱을 연산량으로 봅니다.
+        job = scheduler.get_scheduler().submit(self.session_id, count * count, compute)
+        self._best_job = (alive, job)
+
+    def _strategy_path(self):
+        """ATTACK 기록이 기본 전략을 그대로 따라왔다면 그 위치(path), 벗어났으면 None"""
+        path = ""
+        for guess, s_result, b_result in self.history:
+            if self._strategy_guess(path) != guess:
+                return None
+            path += f"{s_result}{b_result}"
+        return path
+
+    def ready_best_guess(self):
+        """지금 상태의 엔진 최선 추측 (아직 계산 중이면 None)"""
+        alive = self.alive_bitmap
+        if self._best_for_alive is not None and self._best_for_alive[0] == alive:
+            return self._best_for_alive[1]
+        if self._best_job is not None and self._best_job[0] == alive:
+            future = self._best_job[1].future
+            if future.done() and not future.cancelled() and future.exception() is None:
+                self._best_for_alive = (alive, *future.result())
+                self._best_job = None
+                return self._best_for_alive[1]
+        return None
+
+    def guess_quality(self, guess: str) -> dict:
+        """
+        지금 상태에서 guess의 품질을 엔진의 최선 추측과 비교합니다. (전체 재계산 없이 분할 1~2번)
+        결과: {"alive": 가능한 정답 수, "worst": 최악의 경우 남는 수, "expected": 평균적으로 남는 수,
+               "best_guess": 엔진 최선 추측 (없으면 None, 대칭이 없는 상태면 축소 추측 집합의 최선), "best_worst", "best_expected",
+               "best_exact": best_guess가 최선임이 확실한지 (False면 축소 추측 집합에서 고른 근사값),
+               "best_pending": 최선 추측을 아직 계산 중인지 (False인데 best_guess가 None이면 메모리 예산으로 생략)}
+        """
+        import partition
+
+        def score(sizes):
+            total = sum(sizes)
+            return max(sizes), sum(size * size for size in sizes) / total
+
+        alive = self.alive_bitmap
+        report = {"alive": alive.bit_count(), "best_guess": None, "best_worst": None, "best_expected": None,
+                  "best_exact": False}
+        report["worst"], report["expected"] = score([b.bit_count() for b in self._partition(guess).values()])
+
+        best_guess = self.ready_best_guess()
+        if best_guess is not None:
+            sizes = partition.partition_sizes(self.DIGITS, self.scale, alive, best_guess).values()
+            report["best_guess"] = best_guess
+            report["best_worst"], report["best_expected"] = score(list(sizes))
+            report["best_exact"] = self._best_for_alive[2]
+        report["best_pending"] = self._best_job is not None
+        return report
+
+    # --- 스냅샷 / 복원 ---
+
+    def snapshot(self) -> GameState:
+        """현재 상태를 작은 GameState로 만듭니다. (후보는 비트맵, 기록은 정수)"""
+        import partition
+
+        # 인덱스는 테이블이 이미 있으면 테이블로, 없으면 테이블 없이 계산합니다. (스냅샷 때문에 테이블을 만들지 않도록)
+        index_of = lambda number: partition.index_of(self.DIGITS, self.scale, number)
+        if self.alive_bitmap is not None:
+            alive = self.alive_bitmap
+        elif backends.tables_built(self.DIGITS, self.scale):
+            alive = indices_to_bitmap(backends.level_tables(self.DIGITS, self.scale).indices(self.candidates))
+        else:
+            alive = indices_to_bitmap(index_of(number) for number in self.candidates)
+        return GameState(
+            level=self.scale,
+            alive=alive,
+            history=[encode_turn(index_of(guess), s, b) for guess, s, b in self.history],
+            last_guess=index_of(self.last_guess) if self.last_guess else -1,
+            guess_count=self.guess_count,
+            secret_answer=index_of(self.secret_answer) if self.secret_answer else -1,
+            digits=self.DIGITS,
+        )
+
+    def restore(self, state: GameState):
+        """snapshot()으로 만든 상태로 되돌립니다."""
+        if state.level != self.scale:
+            raise ValueError(f"레벨 불일치: 상태는 {state.level}자리, 게임은 {self.scale}자리입니다.")
+        if (state.digits or NumberBaseballGame.DIGITS) != self.DIGITS:
+            raise ValueError(f"기호 집합 불일치: 상태는 {state.digits!r}, 게임은 {self.DIGITS!r}입니다.")
+        import partition
+
+        started = state.alive or state.history   # 후보도 기록도 없다면 아직 generate_all_candidates 전
+        if self.memory_mode == "full":
+            numbers = backends.level_tables(self.DIGITS, self.scale).numbers
+            number_at = numbers.__getitem__
+            self.candidates = [numbers[i] for i in bitmap_to_indices(state.alive)]
+            self.all_possible_numbers = numbers if started else []
+            self.alive_bitmap = None
+        else:
+            numbers = backends.level_tables(self.DIGITS, self.scale).numbers if self.memory_mode == "compact" else None
+            number_at = lambda i: partition.number_at(self.DIGITS, self.scale, i)
+            self.alive_bitmap = state.alive
+            self.candidates = partition.AliveCandidates(self.DIGITS, self.scale, state.alive, numbers)
+            self.all_possible_numbers = numbers if numbers is not None else ()
+        self.history = [(number_at(g), s, b) for g, s, b in state.turns()]
+        self.last_guess = number_at(state.last_guess) if state.last_guess >= 0 else None
+        self.guess_count = state.guess_count
+        self.secret_answer = number_at(state.secret_answer) if state.secret_answer >= 0 else None
+
+        # 트리 위치는 기록을 처음부터 다시 따라가서 찾습니다.
+        self.tree_path = "" if started else None
+        for guess, s, b in self.history:
+            self._advance_tree(guess, s, b)
+
+    # 피클링(워커 전달, 세션 저장)할 때도 문자열 리스트 대신 스냅샷만 보냅니다.
+    def __getstate__(self):
+        return {
+            "scale": self.scale,
+            "backend": self.backend,
+            "session_id": self.session_id,
+            "guess_pool": self.guess_pool,
+            "digits": self.DIGITS,
+            "strategy_tree_file": self.strategy_tree_file,
+            "evil_host": self.evil_host,
+            "memory_mode": self.memory_mode,
+            # ATTACK 추적 (compact / sampled 모드의 비트맵은 restore가 다룸)
+            "track_alive": self.alive_bitmap is not None and self.memory_mode == "full",
+            "state": self.snapshot(),
+        }
+
+    def __setstate__(self, data):
+        self.__init__(data["scale"], backend=data["backend"], session_id=data["session_id"],
+                      guess_pool=data.get("guess_pool", "full"), digits=data.get("digits"))
+        if data["strategy_tree_file"]:
+            self.load_strategy_tree(data["strategy_tree_file"])
+        self.memory_mode = data.get("memory_mode", "full")
+        memory.register_game(self)
+        self.restore(data["state"])
+        self.evil_host = data["evil_host"]
+        if data.get("track_alive"):
+            # ATTACK에서는 후보 리스트 대신 비트맵을 그대로 씁니다.
+            self.alive_bitmap = data["state"].alive
+            self.candidates = []
+            self.tree_path = None
     
     @staticmethod
     def check_sb(guess: str, answer: str) -> tuple[int, int]:
@@ -46,6 +444,11 @@ class NumberBaseballGame:
         현재 후보 리스트에서, 마지막 추측 및 S/B 결과와 일치하는
         후보들만 남기고 필터링합니다.
         """
+        if backends.tables_built(self.DIGITS, self.scale):
+            # 테이블이 이미 있으면 문자열 비교 대신 비트마스크로 거릅니다. (결과는 아래 방식과 같음)
+            tables = backends.level_tables(self.DIGITS, self.scale)
+            return backends.filter_numbers(tables, self.candidates, last_guess, s_result, b_result)
+
         new_candidates = []
         
         # 현재 리스트의 모든 후보를 하나씩 꺼내어 검사
@@ -65,54 +468,198 @@ class NumberBaseballGame:
                 new_candidates.append(candidate)
                 
         return new_candidates
+
+    def apply_feedback(self, last_guess: str, s_result: int, b_result: int):
+        """
+        받은 S/B 결과로 후보 리스트를 갱신하고, 전략 트리에서의 위치도 함께 옮깁니다.
+        """
+        if self.memory_mode == "full":
+            self.candidates = self.filter_candidates(last_guess, s_result, b_result)
+        else:
+            # 비트맵 모드: 문자열을 하나씩 비교하지 않고 비트셋 분할로 한 번에 거릅니다.
+            import partition
+
+            buckets = partition.partition_bitmap(self.DIGITS, self.scale, self.alive_bitmap, last_guess)
+            self.alive_bitmap = buckets.get((s_result, b_result), 0)
+            self.candidates = partition.AliveCandidates(self.DIGITS, self.scale, self.alive_bitmap,
+                                                        self.candidates.numbers)
+        self.history.append((last_guess, s_result, b_result))
+        self._advance_tree(last_guess, s_result, b_result)
+
+    def _strategy_guess(self, path: str):
+        """기본 전략에서 path 위치의 추측 (전략 트리 -> 공유 캐시 순으로 찾고, 모르면 None)"""
+        if path == "":
+            return self.DIGITS[:self.scale]
+        if self.strategy_tree and path in self.strategy_tree:
+            return self.strategy_tree[path]
+        key = (self.DIGITS, self.scale, path)
+        with _strategy_cache_lock:
+            guess = _strategy_cache.get(key)
+            if guess is not None:
+                _strategy_cache.move_to_end(key)
+        return guess
+
+    def _remember_strategy_guess(self, path: str, guess: str):
+        with _strategy_cache_lock:
+            _strategy_cache[(self.DIGITS, self.scale, path)] = guess
+            while len(_strategy_cache) > STRATEGY_CACHE_SIZE:
+                _strategy_cache.popitem(last=False)
+
+    def _advance_tree(self, last_guess: str, s_result: int, b_result: int):
+        # 전략이 추천한 추측을 그대로 던졌을 때만 전략을 계속 따라갈 수 있습니다.
+        if self.tree_path is not None and self._strategy_guess(self.tree_path) == last_guess:
+            self.tree_path += f"{s_result}{b_result}"
+        else:
+            self.tree_path = None
     
     
     def find_next_best_guess(self, stop_callback=None) -> str:
         """
         미니맥스 알고리즘을 사용해 최악의 경우를 최소화하는 다음 추측을 찾습니다.
+        실제 계산은 backends 모듈이 맡고, backend="auto"면 이번 턴의 연산량에 맞는 백엔드를 고릅니다.
         """
-        
+        known_guess = self._known_next_guess()
+        if known_guess is not None:
+            return known_guess
+
+        # 계산은 공용 스케줄러에 맡깁니다. (전역 동시 실행 제한 + 세션 간 공정성 + 작은 작업 우선)
+        # 워커 스레드 안에서는 stop_callback 대신 스케줄러가 주는 중단 신호(should_stop)를 봅니다.
+        cost, compute, guess_count, cacheable = self._search_job()
+        started = time.perf_counter()
+        result = scheduler.get_scheduler().run(self.session_id, cost, compute, stop_callback=stop_callback)
+        return self._finish_search(result, guess_count, cacheable, started)
+
+    async def find_next_best_guess_async(self) -> str:
+        """
+        find_next_best_guess의 asyncio 버전. 스케줄러 작업의 future를 폴링 없이 await합니다.
+        기다리는 태스크가 취소되면(asyncio.CancelledError) 계산 작업도 취소하고 예외를 그대로 올립니다.
+        """
+        import asyncio  # 비동기 API를 쓸 때만 불러옵니다. (모듈 import 비용 절약)
+
+        known_guess = self._known_next_guess()
+        if known_guess is not None:
+            return known_guess
+
+        # 기호 대칭 / 축소 집합 준비도 후보 수에 비례하므로 이벤트 루프 밖(기본 스레드 풀)에서 합니다.
+        loop = asyncio.get_running_loop()
+        cost, compute, guess_count, cacheable = await loop.run_in_executor(None, self._search_job)
+        started = time.perf_counter()
+        job = scheduler.get_scheduler().submit(self.session_id, cost, compute)
+        try:
+            result = await asyncio.wrap_future(job.future)
+        except asyncio.CancelledError:
+            scheduler.get_scheduler().cancel(job)
+            raise
+        return self._finish_search(result, guess_count, cacheable, started)
+
+    def _known_next_guess(self):
+        """계산 없이 바로 답할 수 있으면 그 추측, 아니면 None"""
+        # 기본 전략 위에 있고 이미 아는 위치라면(전략 트리 또는 다른 게임이 계산해 둔 캐시) 바로 꺼냅니다. (O(1))
+        if self.tree_path:
+            known_guess = self._strategy_guess(self.tree_path)
+            if known_guess is not None:
+                return known_guess
+
         # 최적화: 남은 후보가 2개 이하면, 계산할 필요 없이 첫 번째 후보를 반환합니다.
         # (맞으면 4S, 틀리면 2S 2B 등이 나오고, 그러면 다음 후보가 정답으로 확정됩니다.)
         if len(self.candidates) <= 2:
             return self.candidates[0]
-    
-        min_worst_case_size = float('inf')  # '최악의 경우 남는 후보 수'의 최소값
-        best_guess = ""
-    
-        # 1. '정보 수집용 질문'은 5040개의 모든 숫자 중에서 찾습니다.
-        # 2. 이 'potential_guess'가 현재 후보들을 어떻게 나누는지(partition) 시뮬레이션합니다.
-        for potential_guess in self.all_possible_numbers:
-            
-            if stop_callback and stop_callback():
-                # 단순히 return 하는 것보다 Exception을 일으키는 게
-                # 호출한 곳(play_game)에서 감지하기 더 확실합니다.
-                raise InterruptedError("Game Stopped by User")
-            
-            partitions = collections.defaultdict(int)  # {(S, B): 개수}} <-- Dictionary
-            
-            for candidate in self.candidates:
-                s, b = self.check_sb(potential_guess, candidate)
-                partitions[(s, b)] += 1
-                
-            if not partitions:
-                # 현재 후보 리스트가 비어있는 예외적인 경우
-                continue
-                
-            # 3. 이 추측의 '최악의 경우'(가장 크게 남는 그룹의 크기)를 찾습니다.
-            worst_case_size = max(partitions.values())
-            
-            # 4. '최악의 경우'가 가장 작았던 추측을 갱신합니다.
-            if worst_case_size < min_worst_case_size:
-                min_worst_case_size = worst_case_size
-                best_guess = potential_guess
-                
-            # 5.  만약 최악의 경우가 같다면?
-            # -> 기왕이면 '정답이 될 가능성이 있는 후보(self.candidates)'를 질문으로 선택하는 게 유리함
-            elif worst_case_size == min_worst_case_size:
-                if potential_guess in self.candidates:
-                     best_guess = potential_guess
-                
+        return None
+
+    def _search_job(self):
+        """스케줄러에 넘길 (예상 연산량, fn(should_stop), 추측 수, 공유 캐시에 남겨도 되는지)"""
+        # 메모리 예산을 넘는 턴(또는 sampled 모드)은 표본 미니맥스로 계산합니다.
+        if self.memory_mode == "sampled" or not memory.turn_fits(len(self.candidates)):
+            return self._sampled_search_job()
+        if guess_pool.use_reduced(self.guess_pool, len(self.candidates),
+                                  guess_pool.universe_size(self.DIGITS, self.scale)):
+            return self._reduced_search_job()
+
+        # '정보 수집용 질문'은 전체 숫자(all_possible_numbers) 중에서 찾습니다.
+        # 공용 테이블 그대로라면 None을 넘겨 백엔드가 인덱스 범위(range)로 다루게 합니다.
+        tables = backends.level_tables(self.DIGITS, self.scale)
+        if self.all_possible_numbers is None:   # load_history로 만든 상태
+            self.all_possible_numbers = tables.numbers
+        guesses = None if self.all_possible_numbers is tables.numbers else self.all_possible_numbers
+
+        digits, scale, candidates, backend = self.DIGITS, self.scale, self.candidates, self.backend
+        if guesses is None:
+            # 서로 바꿔도 되는 기호가 있으면 이름만 다른 추측들은 대표 하나씩만 검사합니다. (결과는 전체 탐색과 같음)
+            blocks = guess_pool.symmetry_blocks(digits, scale, candidates)
+            if blocks:
+                firsts, lasts = guess_pool.symmetric_guesses(digits, scale, blocks)
+                compute = lambda should_stop: guess_pool.best_symmetric_guess(
+                    digits, scale, candidates, firsts, lasts, backend=backend, stop_callback=should_stop,
+                )
+                return len(firsts) * len(candidates), compute, len(firsts), True
+
+        compute = lambda should_stop: backends.find_best_guess(
+            digits, scale, candidates, guesses, backend=backend, stop_callback=should_stop,
+        )
+        guess_count = len(self.all_possible_numbers)
+        return guess_count * len(candidates), compute, guess_count, guesses is None
+
+    def _sampled_search_job(self):
+        """후보 표본(SAMPLE_CANDIDATES) x 추측 표본(후보 표본 + 전체에서 SAMPLE_GUESSES개)만으로 고르는 미니맥스"""
+        import random
+        import partition
+
+        digits, scale = self.DIGITS, self.scale
+        # 같은 상태면 같은 표본이 나오도록 기록으로 시드를 정합니다.
+        rng = random.Random(repr(self.history))
+        if isinstance(self.candidates, partition.AliveCandidates):
+            indices = partition.sample_indices(self.candidates.bitmap, memory.SAMPLE_CANDIDATES, rng)
+            candidates = [self.candidates._number(i) for i in indices]
+        else:
+            candidates = rng.sample(self.candidates, min(len(self.candidates), memory.SAMPLE_CANDIDATES))
+        universe = partition.bitset_index(digits, scale).size
+        guesses = candidates + [partition.number_at(digits, scale, i)
+                                for i in rng.sample(range(universe), min(universe, memory.SAMPLE_GUESSES))]
+
+        compute = lambda should_stop: backends.find_best_guess_sampled(
+            digits, scale, candidates, guesses, stop_callback=should_stop,
+        )
+        return len(guesses) * len(candidates), compute, len(guesses), False
+
+    def _reduced_search_job(self):
+        """후반 턴: 살아 있는 후보 + 분리용 비후보 추측만 검사합니다. (guess_pool 모듈)"""
+        digits, scale, backend, verify = self.DIGITS, self.scale, self.backend, self.verify_guess_pool
+        candidates = list(self.candidates)
+        pool = guess_pool.reduced_pool(digits, scale, candidates)
+
+        def compute(should_stop):
+            guess, _ = backends.find_best_guess(digits, scale, candidates, pool,
+                                                backend="vector", stop_callback=should_stop)
+            worst = guess_pool.worst_case(guess, candidates)
+            details = {
+                "worst_case": worst,
+                "proven_optimal": worst <= guess_pool.worst_case_lower_bound(scale, len(candidates)),
+            }
+            if verify:
+                full_guess, _ = backends.find_best_guess(digits, scale, candidates, None,
+                                                         backend=backend, stop_callback=should_stop)
+                details["full_guess"] = full_guess
+                details["full_worst_case"] = guess_pool.worst_case(full_guess, candidates)
+                details["matches_full"] = details["full_worst_case"] == worst
+            return guess, "reduced", details
+
+        # 전체 탐색과 다른 추측일 수 있으므로 공유 캐시에는 남기지 않습니다.
+        return len(pool) * len(candidates), compute, len(pool), False
+
+    def _finish_search(self, result, guess_count, cacheable, started) -> str:
+        best_guess, used_backend, *details = result
+        self.last_search = {
+            "backend": used_backend,
+            "guesses": guess_count,
+            "candidates": len(self.candidates),
+            "seconds": time.perf_counter() - started,
+            "memory_mode": self.memory_mode,
+        }
+        if details:
+            self.last_search.update(details[0])
+        # 전체 추측에서 찾은 결과만 공유 캐시에 남깁니다. (표본 결과는 다른 게임에 넘기지 않음)
+        if self.tree_path and cacheable:
+            self._remember_strategy_guess(self.tree_path, best_guess)
         return best_guess
     
     '''
@@ -134,9 +681,11 @@ class NumberBaseballGame:
         입력된 정답이 게임 설정에 맞는지 검사합니다.
         문제가 있으면 에러 메시지를 출력하고 False를 반환합니다.
         """
-        # 검사 1: 숫자 여부 검사
-        if not answer.isdigit():
-            return False, f"입력 오류: 숫자만 입력해야 합니다. (입력값: '{answer}')"
+        # 검사 1: 기호 집합에 있는 기호인지 검사 (기본은 숫자 0~9)
+        if not answer or any(ch not in self.DIGITS for ch in answer):
+            if self.DIGITS == NumberBaseballGame.DIGITS:
+                return False, f"입력 오류: 숫자만 입력해야 합니다. (입력값: '{answer}')"
+            return False, f"입력 오류: '{self.DIGITS}' 중의 기호만 입력해야 합니다. (입력값: '{answer}')"
         
         # 검사 2: 자릿수 확인
         if len(answer) != self.scale:
@@ -149,6 +698,138 @@ class NumberBaseballGame:
         # 모든 검사 통과
         return True, ""
     
+    def solve_batch(self, secret_answers, stop_callback=None) -> dict[str, list[str]]:
+        """
+        여러 정답을 한꺼번에 풉니다. (분석/전체 경우 벤치마크용)
+        모든 게임을 같은 회차 단위로(lock step) 진행하면서, 후보 집합이 같은 게임끼리 묶어
+        그룹마다 `find_next_best_guess`를 한 번만 호출합니다.
+        결과: {정답: [1회차 추측, 2회차 추측, ...]}
+        10회 안에 풀지 못한 정답이 있으면 일부만 채운 기록을 돌려주지 않고 RuntimeError를 일으킵니다.
+        """
+        for secret in secret_answers:
+            is_valid, err_msg = self.validate_answer(secret)
+            if not is_valid:
+                raise ValueError(err_msg)
+
+        self.generate_all_candidates()
+        all_candidates = self.candidates
+        # 그룹마다 후보 리스트를 바꿔 끼우므로 전략 트리 위치는 추적하지 않습니다. (끝나면 되돌림)
+        tree_path = self.tree_path
+        self.tree_path = None
+        histories = {secret: [] for secret in secret_answers}
+
+        # {후보 집합(tuple): (후보 리스트, 이 상태에 있는 정답 리스트)}
+        # 전략이 결정적(deterministic)이므로 같은 후보 집합이면 다음 추측도 같습니다.
+        groups = {tuple(all_candidates): (all_candidates, list(histories))}
+        guess_count = 0
+
+        try:
+            while groups:
+                guess_count += 1
+                if guess_count > 10:  # 안전장치 (play_game과 동일)
+                    unsolved = sorted(secret for _, members in groups.values() for secret in members)
+                    raise RuntimeError(f"{len(unsolved)}개 정답을 10회 안에 풀지 못했습니다: "
+                                       f"{', '.join(unsolved[:10])}{' ...' if len(unsolved) > 10 else ''}")
+
+                next_groups = {}
+                for candidates, members in groups.values():
+                    if stop_callback and stop_callback():
+                        raise InterruptedError("Game Stopped by User")
+
+                    self.candidates = candidates
+                    # 첫 추측은 play_game과 같이 하드코딩
+                    if guess_count == 1:
+                        current_guess = self.DIGITS[:self.scale]
+                    else:
+                        current_guess = self.find_next_best_guess(stop_callback=stop_callback)
+
+                    # 같은 (S, B) 결과를 받은 정답끼리 모읍니다.
+                    buckets = collections.defaultdict(list)
+                    for secret in members:
+                        histories[secret].append(current_guess)
+                        s, b = self.check_sb(current_guess, secret)
+                        if s != self.scale:
+                            buckets[(s, b)].append(secret)
+
+                    for (s, b), bucket_members in buckets.items():
+                        new_candidates = self.filter_candidates(current_guess, s, b)
+                        key = tuple(new_candidates)
+                        if key in next_groups:
+                            next_groups[key][1].extend(bucket_members)
+                        else:
+                            next_groups[key] = (new_candidates, bucket_members)
+
+                groups = next_groups
+        finally:
+            # 배치 도중 바꿔둔 후보 리스트와 전략 트리 위치를 원래대로 돌려놓습니다.
+            self.candidates = all_candidates
+            self.tree_path = tree_path
+
+        return histories
+
+    @staticmethod
+    def turn_message(guess_count: int, candidate_count: int, guess: str, s: int, b: int) -> str:
+        """한 회차의 진행 메시지 (play_game과 터보 재생이 같은 문구를 씁니다)"""
+        lines = [
+            f"--- {guess_count}회차 추측 ---",
+            f"계산 시작... (현재 후보: {candidate_count}개)",
+            f"컴퓨터의 추측: {guess}",
+            f"결과: {s}S {b}B",
+        ]
+        # 줄들을 빈 줄로 연결해서 한 덩어리로 보냅니다.
+        return "\n\n".join(lines)
+
+    def solve(self, secret_answer: str, stop_callback=None) -> dict:
+        """
+        터보 AUTOPLAY용: 화면 출력 없이 게임 전체를 먼저 풀고 회차별 기록을 돌려줍니다.
+        (계산은 play_game과 같은 엔진/백엔드/전략 트리/공유 캐시를 그대로 씁니다)
+        결과: {"turns": [{"turn", "candidates", "guess", "s", "b", "seconds", "message"}, ...],
+               "solved": 정답 여부, "guess_count": 추측 횟수, "seconds": 전체 계산 시간, "error": 오류 메시지}
+        중단되면 InterruptedError가 그대로 올라갑니다.
+        """
+        is_valid, err_msg = self.validate_answer(secret_answer)
+        if not is_valid:
+            raise ValueError(err_msg)
+
+        started = time.perf_counter()
+        self.generate_all_candidates()
+        result = {"turns": [], "solved": False, "guess_count": 0, "seconds": 0.0, "error": None}
+
+        for guess_count in range(1, 12):  # 안전장치 (play_game과 같이 11회까지)
+            if stop_callback and stop_callback():
+                raise InterruptedError("Game Stopped by User")
+
+            turn_started = time.perf_counter()
+            candidate_count = len(self.candidates)
+            if guess_count == 1:
+                current_guess = self.DIGITS[:self.scale]
+            else:
+                current_guess = self.find_next_best_guess(stop_callback=stop_callback)
+            s, b = self.check_sb(current_guess, secret_answer)
+
+            result["turns"].append({
+                "turn": guess_count,
+                "candidates": candidate_count,
+                "guess": current_guess,
+                "s": s,
+                "b": b,
+                "seconds": time.perf_counter() - turn_started,
+                "message": self.turn_message(guess_count, candidate_count, current_guess, s, b),
+            })
+            result["guess_count"] = guess_count
+
+            if s == self.scale:
+                result["solved"] = True
+                break
+
+            self.apply_feedback(current_guess, s, b)
+            if not self.candidates:
+                result["error"] = "오류: 후보 리스트가 비었습니다. (모순 발생)"
+                break
+
+        result["seconds"] = time.perf_counter() - started
+        return result
+
     def play_game(self, secret_answer: str, stop_callback=None):
         """
         컴퓨터가 `find_next_best_guess`를 호출하며 게임을 진행합니다.
@@ -169,6 +850,8 @@ class NumberBaseballGame:
             if stop_callback and stop_callback(): return
             
             self.generate_all_candidates() # (10)P(n)개로 시작
+            if self.memory_notice():
+                yield self.memory_notice()
             guess_count = 0        
             
             while True:
@@ -180,13 +863,7 @@ class NumberBaseballGame:
                 try:
                     guess_count += 1
                     
-                    lines = []
-                    
-                    lines.append(f"--- {guess_count}회차 추측 ---")
-                    lines.append(f"계산 시작... (현재 후보: {len(self.candidates)}개)")
-                    
-                    
-                        
+                    candidate_count = len(self.candidates)
             
                     # 1. 효율성을 위해 하드코딩
                     if guess_count == 1:
@@ -198,15 +875,9 @@ class NumberBaseballGame:
                     else:
                         current_guess = self.find_next_best_guess(stop_callback = stop_callback)
                     
-                    lines.append(f"컴퓨터의 추측: {current_guess}")
-            
                     # 2. 실제 S/B 결과 확인
                     s, b = self.check_sb(current_guess, secret_answer)
-                    lines.append(f"결과: {s}S {b}B")
-                    
-                    # 모아둔 줄들을 줄바꿈(\n)으로 연결해서 한 덩어리로 보냅니다.
-                    full_message = "\n\n".join(lines) 
-                    yield full_message
+                    yield self.turn_message(guess_count, candidate_count, current_guess, s, b)
                     
                     # 3. 정답 확인
                     if s == self.scale:
@@ -218,7 +889,7 @@ class NumberBaseballGame:
                          break
             
                     # 4. 후보 리스트 필터링
-                    self.candidates = self.filter_candidates(current_guess, s, b)
+                    self.apply_feedback(current_guess, s, b)
                     
                     if not self.candidates:
                         yield("오류: 후보 리스트가 비었습니다. (모순 발생)")
@@ -228,5 +899,50 @@ class NumberBaseballGame:
                     yield "⛔ 사용자 요청으로 연산을 중단했습니다."
                     break
 
+    async def play_game_async(self, secret_answer: str):
+        """
+        play_game의 asyncio 버전 (이벤트 루프 하나에서 여러 게임을 함께 돌리기 위함).
+        다음 추측 계산은 스케줄러 작업의 future를 폴링 없이 await하며, 진행 상황을 dict로 내보냅니다.
+          {"type": "message", "text": ...}   play_game이 내보내는 것과 같은 문구
+          {"type": "search", "turn": n, "backend", "guesses", "candidates", "seconds"}   계산한 턴의 계산 정보
+        중단은 stop_callback 대신 태스크 취소로 합니다. 취소되면(asyncio.CancelledError)
+        실행 중인 계산 작업(프로세스 워커 포함)도 멈추고 예외는 그대로 올라갑니다.
+        테이블 생성과 후보 거르기도 다른 게임을 막지 않도록 기본 스레드 풀에서 실행합니다.
+        """
+        import asyncio
+
+        is_valid, err_msg = self.validate_answer(secret_answer)
+        if not is_valid:
+            yield {"type": "message", "text": f"⛔ {err_msg}"}
+            return
+
+        loop = asyncio.get_running_loop()
+        yield {"type": "message", "text": "🎲 게임 데이터를 생성하고 있습니다... (잠시만 기다려주세요)"}
+        await loop.run_in_executor(None, self.generate_all_candidates)
+        if self.memory_notice():
+            yield {"type": "message", "text": self.memory_notice()}
+
+        for guess_count in range(1, 12):  # 안전장치 (play_game과 같이 11회까지)
+            candidate_count = len(self.candidates)
+            if guess_count == 1:
+                current_guess = self.DIGITS[:self.scale]
+            else:
+                self.last_search = None
+                current_guess = await self.find_next_best_guess_async()
+                if self.last_search is not None:
+                    yield {"type": "search", "turn": guess_count, **self.last_search}
+
+            s, b = self.check_sb(current_guess, secret_answer)
+            yield {"type": "message", "text": self.turn_message(guess_count, candidate_count, current_guess, s, b)}
+
+            if s == self.scale:
+                yield {"type": "message", "text": f"정답! {guess_count}회 만에 맞혔습니다."}
+                return
+
+            await loop.run_in_executor(None, self.apply_feedback, current_guess, s, b)
+            if not self.candidates:
+                yield {"type": "message", "text": "오류: 후보 리스트가 비었습니다. (모순 발생)"}
+                return
+
 #game = NumberBaseballGame(n = 5)
 #game.play_game('37209')
\ No newline at end of file
@@ -0,0 +1,243 @@
+"""
+후반 턴용 축소 추측 집합 (살아 있는 후보 + 소수의 '분리용' 비후보 추측)
+
+후보가 수십 개만 남아도 find_next_best_guess는 전체 숫자(6자리 151,200개)를 모두 추측으로 검사합니다.
+후보를 가르는 데 쓸모 있는 것은 후보마다 다른 (자리, 기호)와 일부 후보에만 있는 기호뿐이므로,
+- 살아 있는 후보 전부 (정답일 수도 있는 추측)
+- 그런 (자리, 기호)를 골라 조합한 비후보 추측 SPLITTERS개 (후보에 없는 기호는 빈칸 채우기용)
+- 위에서 가장 잘 가르는 CLIMB_STARTS개를 한 자리씩 바꿔 가며 더 이상 좋아지지 않을 때까지 다듬은 추측
+만 검사합니다. 후보가 모두 포함되므로, 전체 탐색과 최악의 경우 크기가 같으면서 그 값을 내는 후보가 있으면
+전체 탐색과 같은 추측이 나옵니다. (동점 규칙 동일)
+
+결과가 최적인지는
+- 최악의 경우 크기가 하한(ceil(후보 수 / 가능한 결과 수))과 같으면 증명된 것이고 (proven_optimal)
+- 그렇지 않으면 verify=True로 전체 탐색과 직접 비교할 수 있습니다.
+
+기호 대칭 (symmetry_blocks / symmetric_guesses)
+아직 한 번도 추측하지 않은 기호나 어떤 후보에도 없는 기호처럼, 서로 바꿔도 후보 집합이 그대로인 기호들은
+추측에서도 서로 바꿔 쓸 수 있습니다. (같은 분할이 나옴) 그래서 이름만 바꾼 추측들 중 하나씩만 검사하면
+기호 수가 늘어도 검사할 추측 수가 거의 늘지 않습니다. (16진수 4자리 2턴: 43,680개 -> 수백 개)
+이쪽은 근사가 아니라 전체 탐색과 항상 같은 추측을 돌려줍니다. (best_symmetric_guess의 동점 처리)
+"""
+
+import collections
+import math
+import random
+
+
+SPLITTERS = 64                # 비후보 추측 수
+CLIMB_STARTS = 8              # 언덕 오르기로 다듬을 시작 추측 수
+AUTO_MAX_CANDIDATES = 128     # guess_pool="auto"에서 축소 집합을 쓰는 후보 수 상한
+AUTO_MIN_UNIVERSE = 30_240    # guess_pool="auto"는 5자리(10P5) 이상에서만 (작은 레벨은 전체 탐색도 충분히 빠름)
+
+
+def feedback_count(level: int) -> int:
+    """한 추측에 나올 수 있는 (S, B) 결과 수 ((level-1)S 1B는 불가능)"""
+    return (level + 1) * (level + 2) // 2 - 1
+
+
+def worst_case_lower_bound(level: int, candidate_count: int) -> int:
+    """어떤 추측을 던져도 최악의 경우 이만큼은 남습니다."""
+    return -(-candidate_count // feedback_count(level))
+
+
+def splitter_guesses(digits: str, level: int, candidates, limit: int = SPLITTERS, seed: int = 0) -> list[str]:
+    """
+    후보를 가르는 (자리, 기호)와 기호를 골라 조합한 비후보 추측 limit개 (항상 같은 결과)
+    첫 추측은 점수가 가장 높은 것만 고른 탐욕 조합이고, 나머지는 상위 몇 개 중에서 무작위로 고릅니다.
+    """
+    candidates = list(candidates)
+    n = len(candidates)
+    at_count = [collections.Counter(number[pos] for number in candidates) for pos in range(level)]
+    has_count = collections.Counter(ch for number in candidates for ch in number)
+    candidate_set = set(candidates)
+
+    def score(pos, ch):
+        # 절반에 가깝게 나눌수록 높은 점수 (자리 일치 -> S, 포함 여부 -> S+B)
+        return min(at_count[pos][ch], n - at_count[pos][ch]) * 2 + min(has_count[ch], n - has_count[ch])
+
+    rng = random.Random(seed)
+    splitters = []
+    seen = set()
+    for attempt in range(limit * 8):
+        if len(splitters) >= limit:
+            break
+        used = set()
+        number = [None] * level
+        positions = list(range(level))
+        if attempt:
+            rng.shuffle(positions)
+        for pos in positions:
+            options = sorted((ch for ch in digits if ch not in used),
+                             key=lambda ch: (-score(pos, ch), digits.index(ch)))
+            ch = options[0] if not attempt else rng.choice(options[:3])
+            number[pos] = ch
+            used.add(ch)
+        guess = "".join(number)
+        if guess not in candidate_set and guess not in seen:
+            seen.add(guess)
+            splitters.append(guess)
+    return splitters
+
+
+def split_score(guess: str, candidates) -> tuple[int, int]:
+    """(최악의 경우 크기, 버킷 크기 제곱합) - 작을수록 잘 가르는 추측"""
+    buckets = collections.Counter()
+    guess_set = set(guess)
+    for number in candidates:
+        strikes = sum(g == c for g, c in zip(guess, number))
+        buckets[strikes, len(guess_set.intersection(number))] += 1
+    return max(buckets.values()), sum(size * size for size in buckets.values())
+
+
+def climb(digits: str, guess: str, candidates) -> str:
+    """한 자리를 안 쓴 기호로 바꾸거나 두 자리를 맞바꿔 split_score가 줄어드는 동안 계속 옮겨 갑니다."""
+    best, best_score = guess, split_score(guess, candidates)
+    improved = True
+    while improved:
+        improved = False
+        unused = [ch for ch in digits if ch not in best]
+        neighbours = [best[:pos] + ch + best[pos + 1:] for pos in range(len(best)) for ch in unused]
+        for i in range(len(best)):
+            for j in range(i + 1, len(best)):
+                chars = list(best)
+                chars[i], chars[j] = chars[j], chars[i]
+                neighbours.append("".join(chars))
+        for neighbour in neighbours:
+            score = split_score(neighbour, candidates)
+            if score < best_score:
+                best, best_score = neighbour, score
+                improved = True
+    return best
+
+
+def reduced_pool(digits: str, level: int, candidates, limit: int = SPLITTERS) -> list[str]:
+    """축소 추측 집합: 후보 전부 + 분리용 추측 + 다듬은 추측 (전체 숫자 순서로 정렬해 동점 규칙을 전체 탐색과 맞춤)"""
+    import partition
+
+    candidates = list(candidates)
+    pool = set(candidates)
+    pool.update(splitter_guesses(digits, level, candidates, limit))
+    starts = sorted(pool, key=lambda guess: split_score(guess, candidates))[:CLIMB_STARTS]
+    pool.update(climb(digits, guess, candidates) for guess in starts)
+    return sorted(pool, key=lambda number: partition.index_of(digits, level, number))
+
+
+def worst_case(guess: str, candidates) -> int:
+    """guess를 던졌을 때 최악의 경우 남는 후보 수"""
+    return split_score(guess, candidates)[0]
+
+
+def use_reduced(mode: str, candidate_count: int, universe: int) -> bool:
+    """guess_pool 설정(full / reduced / auto)에 따라 이번 턴에 축소 집합을 쓸지"""
+    if mode == "reduced":
+        return True
+    if mode == "auto":
+        return candidate_count <= AUTO_MAX_CANDIDATES and universe >= AUTO_MIN_UNIVERSE
+    return False
+
+
+def universe_size(digits: str, level: int) -> int:
+    return math.perm(len(digits), level)
+
+
+# --- 기호 대칭 ---
+
+def _swap_preserves(x: str, y: str, candidates, candidate_set) -> bool:
+    """후보마다 기호 x와 y를 맞바꿔도 후보 집합이 그대로인지"""
+    table = str.maketrans(x + y, y + x)
+    return all(number.translate(table) in candidate_set
+               for number in candidates if x in number or y in number)
+
+
+def symmetry_blocks(digits: str, level: int, candidates) -> list[list[str]]:
+    """
+    서로 바꿔도 후보 집합이 그대로인 기호 묶음들 (기호 2개 이상인 묶음만, 각 묶음은 digits 순서)
+    자리별 등장 횟수가 같은 기호끼리만 맞바꾸기를 확인하고, 묶음의 첫 기호와 바꿔도 그대로면 같은 묶음에 넣습니다.
+    (첫 기호와의 맞바꾸기들로 묶음 안의 모든 치환을 만들 수 있음)
+    """
+    candidates = list(candidates)
+    candidate_set = set(candidates)
+    signature = {ch: [0] * level for ch in digits}
+    for number in candidates:
+        for pos, ch in enumerate(number):
+            signature[ch][pos] += 1
+
+    groups = collections.defaultdict(list)
+    for ch in digits:
+        groups[tuple(signature[ch])].append(ch)
+
+    blocks = []
+    for group in groups.values():
+        group_blocks = []
+        for ch in group:
+            for block in group_blocks:
+                if _swap_preserves(block[0], ch, candidates, candidate_set):
+                    block.append(ch)
+                    break
+            else:
+                group_blocks.append([ch])
+        blocks.extend(block for block in group_blocks if len(block) > 1)
+    return blocks
+
+
+def symmetric_guesses(digits: str, level: int, blocks) -> tuple[list[str], list[str]]:
+    """
+    기호 이름만 바꾼 추측들을 하나로 묶은 대표들. (firsts, lasts)
+    - firsts[i]: i번째 묶음에서 전체 숫자 순서로 가장 앞선 추측 (묶음 기호를 작은 것부터 나온 순서대로 씀)
+    - lasts[i] : 같은 묶음에서 가장 뒤의 추측 (큰 것부터)
+    firsts는 전체 숫자 순서대로 나옵니다.
+    """
+    block_of = {ch: block for block in blocks for ch in block}
+    firsts = []
+    number = []
+    used = set()
+
+    def place(pos):
+        if pos == level:
+            firsts.append("".join(number))
+            return
+        for ch in digits:
+            if ch in used:
+                continue
+            block = block_of.get(ch)
+            # 묶음 기호는 그 묶음에서 아직 안 쓴 것 중 가장 앞선 기호만 씁니다.
+            if block is not None and ch != next(c for c in block if c not in used):
+                continue
+            used.add(ch)
+            number.append(ch)
+            place(pos + 1)
+            number.pop()
+            used.discard(ch)
+
+    place(0)
+
+    mirror = {}
+    for block in blocks:
+        mirror.update(zip(block, reversed(block)))
+    table = str.maketrans(mirror)
+    return firsts, [first.translate(table) for first in firsts]
+
+
+def best_symmetric_guess(digits: str, level: int, candidates, firsts, lasts,
+                         backend: str = "auto", stop_callback=None):
+    """
+    대표 추측만 검사해 전체 탐색과 같은 결과를 냅니다. 반환값: (추측, 사용한 백엔드)
+    묶음 안의 추측은 분할도 같고 후보인지도 같으므로,
+    - 최선이 후보가 아니면: 최악의 경우가 최소인 첫 추측 = 그런 묶음 중 가장 앞선 firsts
+    - 최선이 후보면: 최소인 마지막 후보 = 후보 묶음들의 lasts 중 최소인 마지막 것 (lasts만 다시 검사)
+    """
+    import backends
+
+    guess, used_backend = backends.find_best_guess(digits, level, candidates, firsts,
+                                                   backend=backend, stop_callback=stop_callback)
+    candidate_set = set(candidates)
+    if guess not in candidate_set:
+        return guess, used_backend
+
+    index_of = backends.level_tables(digits, level).index_of
+    candidate_lasts = sorted((last for first, last in zip(firsts, lasts) if first in candidate_set),
+                             key=index_of.__getitem__)
+    guess, _ = backends.find_best_guess(digits, level, candidates, candidate_lasts,
+                                        backend=backend, stop_callback=stop_callback)
+    return guess, used_backend
@@ -0,0 +1,242 @@
+"""
+로컬 부하 테스트: 동시 접속 플레이어 시뮬레이션
+
+app.py의 start_game / logic_autoplay / logic_player_attack / logic_player_defense가 쓰는 것과 같은
+엔진 API를 직접 호출해 AUTOPLAY, ATTACK, DEFENSE 세션을 동시에 돌립니다.
+(Streamlit도 세션마다 스크립트를 스레드에서 실행하므로, 세션 하나 = 스레드 하나로 흉내 냅니다)
+
+동시 접속 수를 단계적으로 늘려 가며 단계마다
+- 응답 지연 p50 / p95 / p99 (사용자 입력 -> 화면에 보일 응답까지)
+- CPU 사용률 (이 프로세스 + 계산 워커 프로세스)
+- 프로세스별 RSS
+- 스케줄러 대기열/대기 시간
+을 출력합니다. 모든 것은 localhost 안에서만 실행됩니다.
+
+사용법:
+    python loadtest.py --levels 3 4 --concurrency 1 2 4 8 --duration 20 --think 0.5
+    python loadtest.py --modes DEFENSE --levels 5 --concurrency 1 4 --json result.json
+"""
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+
+import backends
+import memory
+import scheduler
+from game import NumberBaseballGame
+from state import bitmap_to_indices
+
+
+MODES = ("AUTOPLAY", "ATTACK", "DEFENSE")
+
+
+# --- 세션 시뮬레이션 ---
+
+def _random_secret(level):
+    return "".join(random.sample(NumberBaseballGame.DIGITS, level))
+
+
+def simulate_autoplay(level, think, record, should_stop):
+    """AUTOPLAY: play_game이 메시지를 하나씩 내보낼 때마다 그 간격을 응답 지연으로 봅니다."""
+    game = NumberBaseballGame(n=level, session_id=threading.get_ident())
+    last = time.perf_counter()
+    for _ in game.play_game(_random_secret(level), stop_callback=should_stop):
+        now = time.perf_counter()
+        record(now - last)
+        last = now
+
+
+def simulate_attack(level, think, record, should_stop):
+    """ATTACK: 플레이어가 (아직 가능한 숫자 중 하나를) 입력하면 엔진이 S/B를 판정합니다."""
+    game = NumberBaseballGame(n=level, session_id=threading.get_ident())
+    game.secret_answer = _random_secret(level)
+    game.track_alive()
+    numbers = backends.level_tables(game.DIGITS, level).numbers
+
+    while not should_stop():
+        time.sleep(think)
+        guess = numbers[random.choice(bitmap_to_indices(game.alive_bitmap))]
+
+        # 판정 + 추측 분석(엔진 최선 추측과 비교)까지가 한 번의 응답입니다.
+        started = time.perf_counter()
+        is_valid, _ = game.validate_answer(guess)
+        game.guess_quality(guess)
+        s, b = game.check_sb(guess, game.secret_answer)
+        game.narrow_alive(guess, s, b)
+        game.guess_count += 1
+        record(time.perf_counter() - started)
+
+        if not is_valid or s == level:
+            break
+
+
+def simulate_defense(level, think, record, should_stop):
+    """DEFENSE: 플레이어가 S/B를 알려 주면 엔진이 후보를 줄이고 다음 추측을 계산합니다."""
+    secret = _random_secret(level)
+    game = NumberBaseballGame(n=level, session_id=threading.get_ident())
+
+    started = time.perf_counter()
+    game.generate_all_candidates()
+    game.last_guess = game.DIGITS[:level]
+    game.guess_count = 1
+    record(time.perf_counter() - started)
+
+    while not should_stop():
+        time.sleep(think)
+        s, b = game.check_sb(game.last_guess, secret)
+        if s == level:
+            break
+
+        started = time.perf_counter()
+        game.apply_feedback(game.last_guess, s, b)
+        if len(game.candidates) == 1:
+            record(time.perf_counter() - started)
+            break
+        try:
+            game.last_guess = game.find_next_best_guess(stop_callback=should_stop)
+        except InterruptedError:
+            break
+        game.guess_count += 1
+        record(time.perf_counter() - started)
+
+
+SIMULATORS = {
+    "AUTOPLAY": simulate_autoplay,
+    "ATTACK": simulate_attack,
+    "DEFENSE": simulate_defense,
+}
+
+
+# --- 자원 측정 (/proc 기반, 리눅스) ---
+
+def _child_pids(pid):
+    children = []
+    try:
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                children.extend(int(p) for p in f.read().split())
+    except OSError:
+        pass
+    return children
+
+
+def process_tree():
+    """이 프로세스와 그 자식(계산 워커) 프로세스들의 pid 목록"""
+    pids = [os.getpid()]
+    for pid in pids:
+        pids.extend(_child_pids(pid))
+    return pids
+
+
+def cpu_seconds(pid):
+    """프로세스가 지금까지 쓴 CPU 시간 (user + system)"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, IndexError, ValueError):
+        return 0.0
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+# --- 단계 실행 ---
+
+def run_step(concurrency, modes, levels, duration, think):
+    """동시 세션 concurrency개를 duration초 동안 돌리고 지표를 모읍니다."""
+    latencies = []
+    latencies_lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+    stop = lambda: time.perf_counter() > deadline
+    games = [0]
+
+    def record(seconds):
+        with latencies_lock:
+            latencies.append(seconds)
+
+    def session_loop(session_no):
+        rng = random.Random(session_no)
+        while not stop():
+            mode = rng.choice(modes)
+            level = rng.choice(levels)
+            SIMULATORS[mode](level, think, record, stop)
+            with latencies_lock:
+                games[0] += 1
+            time.sleep(think)
+
+    cpu_before = {pid: cpu_seconds(pid) for pid in process_tree()}
+    wall_started = time.perf_counter()
+    peak_rss = {}
+
+    threads = [threading.Thread(target=session_loop, args=(i,), daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+
+    # 세션이 도는 동안 RSS를 주기적으로 재서 최댓값을 남깁니다.
+    while any(thread.is_alive() for thread in threads):
+        for pid in process_tree():
+            peak_rss[pid] = max(peak_rss.get(pid, 0), memory.rss_bytes(pid))
+        time.sleep(0.2)
+
+    wall = time.perf_counter() - wall_started
+    cpu_used = sum(cpu_seconds(pid) - cpu_before.get(pid, 0.0) for pid in process_tree())
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "games": games[0],
+        "responses": len(latencies),
+        "p50_ms": _percentile(latencies, 0.50) * 1000,
+        "p95_ms": _percentile(latencies, 0.95) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+        "max_ms": (latencies[-1] if latencies else 0.0) * 1000,
+        "cpu_percent": cpu_used / wall * 100,
+        "rss_mb": {str(pid): round(rss / 2**20, 1) for pid, rss in sorted(peak_rss.items())},
+        "scheduler": scheduler.get_scheduler().metrics(),
+        "memory": memory.report(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="숫자야구 엔진 동시 접속 부하 테스트 (localhost)")
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=MODES)
+    parser.add_argument("--levels", nargs="+", type=int, default=[3, 4])
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 2, 4, 8])
+    parser.add_argument("--duration", type=float, default=20.0, help="단계별 실행 시간 (초)")
+    parser.add_argument("--think", type=float, default=0.5, help="플레이어 입력 사이 대기 시간 (초)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="결과를 JSON 파일로도 저장")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    print(f"모드 {args.modes} / 레벨 {args.levels} / think {args.think}s / 단계당 {args.duration}s")
+    print(f"백엔드 측정값: {backends.calibrate().as_dict()}")
+    print(f"{'동시':>4} {'게임':>5} {'응답':>6} {'p50(ms)':>9} {'p95(ms)':>9} {'p99(ms)':>9} "
+          f"{'CPU%':>6} {'RSS 합(MB)':>10} {'대기 p95(ms)':>12}")
+
+    results = []
+    for concurrency in args.concurrency:
+        result = run_step(concurrency, args.modes, args.levels, args.duration, args.think)
+        results.append(result)
+        print(f"{concurrency:>4} {result['games']:>5} {result['responses']:>6} "
+              f"{result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f} {result['p99_ms']:>9.1f} "
+              f"{result['cpu_percent']:>6.0f} {sum(result['rss_mb'].values()):>10.1f} "
+              f"{result['scheduler']['wait_p95_seconds'] * 1000:>12.1f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+    backends.shutdown_pools()
+
+
+if __name__ == "__main__":
+    main()
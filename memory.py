@@ -0,0 +1,301 @@
+"""
+메모리 사용량 집계와 예산에 맞춘 모드 선택
+
+레벨 9에서는 전체 숫자 테이블만 수백 MB(숫자당 약 200바이트)이고, 게임마다 후보 리스트(숫자당 8바이트)와
+턴마다 미니맥스 커널의 작업 공간(후보당 약 100바이트)이 더해집니다.
+환경 변수 NBB_MEMORY_BUDGET_MB로 프로세스 예산을 주면(없으면 cgroup/시스템 메모리의 DEFAULT_BUDGET_SHARE),
+새 게임과 새 턴마다 남은 양(headroom_bytes)과 예상 사용량을 비교해
+- full    : 전체 테이블 + 후보 리스트 (기존 방식)
+- compact : 전체 테이블은 공유하되, 게임마다 후보를 비트맵 하나로만 들고 partition 모듈로 거릅니다.
+- sampled : 전체 테이블 없이 비트맵 + 표본 미니맥스 (후보/추측 표본 크기만큼만 메모리 사용)
+중 예산 안에 들어가는 가장 정확한 모드를 고릅니다. NBB_MEMORY_BUDGET_MB=0이면 예산 없이 항상 full입니다.
+한 턴의 커널 작업 공간이 예산을 넘으면 그 턴만 표본 미니맥스로 계산합니다.
+
+NBB_TRACEMALLOC=1이면 tracemalloc도 켜서 파이썬 할당량을 report()에 함께 보여 줍니다.
+
+사용법:
+    python memory.py selftest --budget-mb 60 --levels 4 6 7    # 예산 안에서 게임을 차례로 돌리고 최대 RSS 확인
+"""
+
+import argparse
+import functools
+import math
+import os
+import random
+import sys
+import tracemalloc
+import weakref
+
+import backends
+
+
+# 숫자(또는 후보) 하나당 예상 바이트 (3.11, 6~7자리에서 tracemalloc으로 잰 값)
+TABLE_BYTES_PER_NUMBER = 200    # backends.LevelTables: 문자열 + index_of + 마스크 2개
+LIST_BYTES_PER_NUMBER = 8       # 후보 리스트 (문자열은 테이블과 공유)
+KERNEL_BYTES_PER_CANDIDATE = 100  # vector 커널이 턴마다 만드는 (pos_mask, digit_mask) 쌍 (워커마다)
+
+# 예산을 정하지 않았을 때 쓰는 몫 (cgroup 제한과 물리 메모리 중 작은 쪽 기준)
+DEFAULT_BUDGET_SHARE = 0.5
+
+# 표본 미니맥스 크기
+SAMPLE_CANDIDATES = 1000
+SAMPLE_GUESSES = 1000
+
+MODES = ("full", "compact", "sampled")
+
+_games = weakref.WeakSet()
+
+if os.environ.get("NBB_TRACEMALLOC") == "1":
+    tracemalloc.start()
+
+
+# --- 측정 (/proc 기반, 리눅스) ---
+
+def _status_field(pid, field) -> int:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def rss_bytes(pid="self") -> int:
+    """프로세스의 현재 RSS (읽을 수 없으면 0)"""
+    return _status_field(pid, "VmRSS")
+
+
+def peak_rss_bytes(pid="self") -> int:
+    """프로세스의 최대 RSS"""
+    return _status_field(pid, "VmHWM")
+
+
+@functools.lru_cache(maxsize=None)
+def system_memory_bytes() -> int:
+    """이 프로세스가 쓸 수 있는 메모리 (cgroup v2/v1 제한과 물리 메모리 중 작은 쪽, 모르면 0)"""
+    limits = []
+    try:
+        limits.append(os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES"))
+    except (OSError, ValueError):
+        pass
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+        except OSError:
+            continue
+        if value.isdigit():
+            limits.append(int(value))   # 제한이 없으면 "max"(v2) 또는 아주 큰 값(v1)
+    return min(limits) if limits else 0
+
+
+def default_budget_bytes():
+    """쓸 수 있는 메모리의 DEFAULT_BUDGET_SHARE (모르면 None)"""
+    return int(system_memory_bytes() * DEFAULT_BUDGET_SHARE) or None
+
+
+def budget_bytes():
+    """
+    프로세스 예산: NBB_MEMORY_BUDGET_MB, 없으면 default_budget_bytes()
+    NBB_MEMORY_BUDGET_MB=0이거나 쓸 수 있는 메모리를 모르면 None (예산 없음)
+    """
+    value = os.environ.get("NBB_MEMORY_BUDGET_MB")
+    if value:
+        return int(float(value) * 2**20) or None
+    return default_budget_bytes()
+
+
+def tables_bytes(digits: str, level: int) -> int:
+    """backends.LevelTables 하나의 예상 바이트"""
+    return math.perm(len(digits), level) * TABLE_BYTES_PER_NUMBER
+
+
+def index_bytes(digits: str, level: int) -> int:
+    """partition.BitsetIndex: (자리 수 + 1) x 기호 수개의 비트맵 (만드는 동안은 바이트 배열까지 두 배)"""
+    return math.perm(len(digits), level) * (level + 1) * len(digits) // 8
+
+
+def shared_bytes() -> int:
+    """이미 만든 공용 테이블과 색인의 예상 바이트"""
+    import partition
+
+    total = sum(tables_bytes(digits, level) for digits, level in backends.built_tables())
+    return total + sum(index_bytes(digits, level) for digits, level in partition.built_indexes())
+
+
+def accounted_bytes() -> int:
+    """엔진이 잡고 있다고 집계한 바이트 (공용 테이블/색인 + 살아 있는 게임들)"""
+    return shared_bytes() + sum(game_bytes(game) for game in list(_games))
+
+
+_baseline = None
+
+
+def headroom_bytes() -> float:
+    """
+    예산에서 지금 사용량을 뺀 남은 양 (예산이 없으면 무한대)
+    사용량은 RSS와 (기본 RSS + 집계한 사용량) 중 큰 쪽입니다. 기본 RSS는 RSS 중 집계에 없는 부분의 최솟값
+    (인터프리터와 라이브러리)입니다. 턴마다의 커널 작업 공간이나 할당자가 들고 있는 메모리처럼 집계에 없는 증가분은
+    RSS 쪽에서 잡히고, 아직 RSS에 다 올라오지 않은 예약분은 집계 쪽에서 잡힙니다.
+    """
+    global _baseline
+
+    budget = budget_bytes()
+    if budget is None:
+        return float('inf')
+    rss = rss_bytes()
+    accounted = accounted_bytes()
+    unaccounted = max(rss - accounted, 0)
+    if _baseline is None or unaccounted < _baseline:
+        _baseline = unaccounted
+    return budget - max(rss, _baseline + accounted)
+
+
+# --- 예상 사용량 / 모드 선택 ---
+
+def estimate_game_bytes(digits: str, level: int, mode: str) -> int:
+    """새 게임을 mode로 시작할 때 더 필요한 예상 바이트 (이미 만든 공용 테이블/색인은 제외)"""
+    import partition
+
+    n = math.perm(len(digits), level)
+    index = 0 if partition.index_built(digits, level) else index_bytes(digits, level) * 2
+    if mode == "full":
+        tables = 0 if backends.tables_built(digits, level) else n * TABLE_BYTES_PER_NUMBER
+        return tables + n * LIST_BYTES_PER_NUMBER * 2   # 후보 리스트 + 첫 필터링 때의 사본
+    if mode == "compact":
+        tables = 0 if backends.tables_built(digits, level) else n * TABLE_BYTES_PER_NUMBER
+        return tables + index + n // 8 * 2
+    return index + n // 8 * 2
+
+
+def plan_game(digits: str, level: int) -> str:
+    """
+    예산 안에 들어가는 가장 정확한 모드 (full -> compact -> sampled 순)
+    어느 모드도 남은 양에 들어가지 않으면, 살아 있는 게임이 쓰지 않는 공용 테이블/색인을 놓고 다시 고릅니다.
+    """
+    for attempt in range(2):
+        room = headroom_bytes()
+        for mode in MODES:
+            if estimate_game_bytes(digits, level, mode) <= room:
+                return mode
+        if not release_unused(keep=(digits, level)):
+            break
+    return "sampled"
+
+
+def release_unused(keep=None) -> bool:
+    """살아 있는 게임의 (기호 집합, 레벨)도 keep도 아닌 공용 테이블/색인을 놓습니다. 하나라도 놓았으면 True"""
+    import partition
+
+    in_use = {(game.DIGITS, game.scale) for game in list(_games)}
+    in_use.add(keep)
+    released = False
+    for key in backends.built_tables():
+        if key not in in_use:
+            backends.release_tables(*key)
+            released = True
+    for key in partition.built_indexes():
+        if key not in in_use:
+            partition.release_index(*key)
+            released = True
+    return released
+
+
+def process_tables_fit(digits: str, level: int) -> bool:
+    """
+    process 백엔드의 워커마다 전체 테이블을 만들어도 예산 안인지
+    (워커는 테이블을 따로 만들므로 워커 수만큼 곱해집니다. auto가 process를 고를지 정할 때 씀)
+    """
+    budget = budget_bytes()
+    return budget is None or tables_bytes(digits, level) * backends.default_workers() <= budget
+
+
+def turn_fits(candidate_count: int) -> bool:
+    """후보 candidate_count개로 전체 미니맥스를 돌려도 예산 안인지"""
+    return candidate_count * KERNEL_BYTES_PER_CANDIDATE * backends.default_workers() <= headroom_bytes()
+
+
+# --- 게임별 / 프로세스 집계 ---
+
+def register_game(game):
+    """report()의 게임별 집계에 포함합니다. (게임이 사라지면 자동으로 빠짐)"""
+    _games.add(game)
+
+
+def game_bytes(game) -> int:
+    """게임 하나가 따로 들고 있는 바이트 (공용 테이블 제외)"""
+    candidates = game.candidates
+    size = sys.getsizeof(candidates) if isinstance(candidates, list) else 0
+    if game.alive_bitmap is not None:
+        size += sys.getsizeof(game.alive_bitmap)
+    size += sys.getsizeof(game.history) + len(game.history) * 80
+    return size
+
+
+def report() -> dict:
+    """프로세스 전체 메모리 지표 (텔레메트리용)"""
+    import partition
+
+    games = list(_games)
+    budget = budget_bytes()
+    result = {
+        "rss_bytes": rss_bytes(),
+        "peak_rss_bytes": peak_rss_bytes(),
+        "budget_bytes": budget,
+        "accounted_bytes": accounted_bytes(),
+        "baseline_rss_bytes": _baseline,
+        "games": len(games),
+        "games_bytes": sum(game_bytes(game) for game in games),
+        "games_by_mode": {mode: sum(game.memory_mode == mode for game in games) for mode in MODES},
+        # 지금 있는 게임들의 레벨 중 공용 테이블/색인을 이미 만든 레벨
+        "tables_levels": sorted({game.scale for game in games if backends.tables_built(game.DIGITS, game.scale)}),
+        "index_levels": sorted({game.scale for game in games if partition.index_built(game.DIGITS, game.scale)}),
+    }
+    if tracemalloc.is_tracing():
+        result["traced_bytes"], result["traced_peak_bytes"] = tracemalloc.get_traced_memory()
+    return result
+
+
+# --- 자체 점검 ---
+
+def selftest(budget_mb: float, levels, seed: int = 0) -> bool:
+    """
+    예산을 budget_mb로 두고 levels의 게임(AUTOPLAY)을 차례로 끝까지 돌린 뒤, 최대 RSS가 예산 안인지 확인합니다.
+    (레벨이 커질수록 full -> compact -> sampled로 내려가야 통과)
+    """
+    from game import NumberBaseballGame
+
+    os.environ["NBB_MEMORY_BUDGET_MB"] = str(budget_mb)
+    budget = budget_bytes()
+    rng = random.Random(seed)
+    for level in levels:
+        game = NumberBaseballGame(n=level, backend="vector")
+        secret = "".join(rng.sample(game.DIGITS, level))
+        for _ in game.play_game(secret):
+            pass
+        print(f"{level}자리: {game.memory_mode}, RSS {rss_bytes() / 2**20:.1f}MB, "
+              f"최대 RSS {peak_rss_bytes() / 2**20:.1f}MB, 남은 양 {headroom_bytes() / 2**20:.1f}MB")
+        del game   # 끝난 게임 (다음 게임이 이 레벨의 테이블을 놓을 수 있도록)
+    peak = peak_rss_bytes()
+    ok = peak <= budget
+    print(f"최대 RSS {peak / 2**20:.1f}MB / 예산 {budget / 2**20:.1f}MB -> {'OK' if ok else '초과'}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="메모리 예산 자체 점검")
+    sub = parser.add_subparsers(dest="command", required=True)
+    test = sub.add_parser("selftest", help="예산 안에서 게임을 차례로 돌리고 최대 RSS가 예산 안인지 확인")
+    test.add_argument("--budget-mb", type=float, default=60)
+    test.add_argument("--levels", nargs="+", type=int, default=[4, 6, 7])
+    test.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if not selftest(args.budget_mb, args.levels, args.seed):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
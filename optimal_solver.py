@@ -0,0 +1,274 @@
+"""
+평균 추측 횟수 최소화(Optimal Expected Guesses) 솔버
+
+미니맥스는 '최악의 경우'를 줄이는 전략이라 평균 추측 횟수가 최소라는 보장은 없습니다.
+이 모듈은 후보 집합마다 "모든 정답에 대한 추측 횟수의 합"이 가장 작은 전략을 정확히 탐색합니다.
+
+    T(C) = |C| + Σ T(C_b)      (b: 이번 추측으로 나뉜 (S, B) 그룹 중 정답(kS 0B)을 제외한 그룹)
+    평균 추측 횟수 = T(C) / |C|
+
+- 메모이제이션: 같은 후보 집합은 한 번만 풉니다. (트랜스포지션 테이블)
+- 대칭 정규화: 숫자 바꾸기(relabel)와 자리 바꾸기(permutation)로 같아지는 집합은 같은 키로 저장합니다.
+- 가지치기: 허용 가능한(admissible) 하한으로 현재 최선보다 나빠질 추측은 끝까지 계산하지 않습니다.
+- 메모리 상한: 테이블이 max_table_mb를 넘으면 가장 오래 쓰지 않은 항목(LRU)부터 지웁니다.
+
+사용법:
+    python optimal_solver.py --level 3
+    python optimal_solver.py --level 4 --table-mb 4096    # 수 시간 이상 걸릴 수 있습니다.
+    python optimal_solver.py --level 3 --digits hex       # 다른 기호 집합 (game.ALPHABETS 이름 또는 기호 문자열)
+"""
+
+import argparse
+import collections
+import itertools
+import time
+
+from game import ALPHABETS, NumberBaseballGame
+
+
+class TranspositionTable:
+    """메모리 상한이 있는 LRU 캐시 {정규화된 후보 집합: (값, 정확한 값인지 여부)}"""
+
+    def __init__(self, max_bytes: int, entry_bytes):
+        self.max_bytes = max_bytes
+        self.entry_bytes = entry_bytes  # 항목 하나의 메모리 추정 함수
+        self.used_bytes = 0
+        self.entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key, value, is_exact):
+        if key in self.entries:
+            self.entries[key] = (value, is_exact)
+            self.entries.move_to_end(key)
+            return
+
+        self.entries[key] = (value, is_exact)
+        self.used_bytes += self.entry_bytes(key)
+        while self.used_bytes > self.max_bytes and self.entries:
+            old_key, _ = self.entries.popitem(last=False)
+            self.used_bytes -= self.entry_bytes(old_key)
+            self.evictions += 1
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class ExpectedGuessSolver:
+
+    def __init__(self, level: int, max_table_mb: int = 1024, candidate_guesses_only: bool = False,
+                 digits: str = None):
+        self.level = level
+        self.candidate_guesses_only = candidate_guesses_only
+        self.digits = digits or NumberBaseballGame.DIGITS
+        self.base = len(self.digits)
+
+        # 모든 숫자를 인덱스로 다루고, S/B 계산은 비트마스크로 합니다.
+        # - pos_mask: (자리 * 기호 수 + 숫자) 비트 -> 겹치는 비트 수 = 스트라이크
+        # - digit_mask: 숫자 비트 -> 겹치는 비트 수 = 공통 숫자 (S + B)
+        self.numbers = ["".join(p) for p in itertools.permutations(self.digits, level)]
+        self.index_of = {number: i for i, number in enumerate(self.numbers)}
+        self.symbols = [tuple(self.digits.index(ch) for ch in number) for number in self.numbers]
+        self.pos_masks = [sum(1 << (pos * self.base + d) for pos, d in enumerate(sym)) for sym in self.symbols]
+        self.digit_masks = [sum(1 << d for d in sym) for sym in self.symbols]
+        self.win_code = level * 16 + level
+
+        # 한 번의 추측이 만들 수 있는 '정답이 아닌' 결과 (S, B)의 가짓수
+        responses = {NumberBaseballGame.check_sb(self.numbers[0], number) for number in self.numbers}
+        self.branching = len(responses) - 1
+
+        self.position_perms = list(itertools.permutations(range(level)))
+        self.table = TranspositionTable(
+            max_table_mb * 1024 * 1024,
+            # 키(정수 튜플) 하나의 대략적인 크기: 튜플 헤더 + 항목당 포인터 + 딕셔너리/OrderedDict 오버헤드
+            entry_bytes=lambda key: 56 + 8 * len(key) + 200,
+        )
+        self.nodes = 0
+
+    # --- 하한(lower bound) ---
+
+    def lower_bound(self, n: int) -> int:
+        """
+        후보 n개를 푸는 데 필요한 추측 횟수 합의 하한.
+        1회차에 맞힐 수 있는 정답은 최대 1개, d회차에는 최대 branching^(d-1)개이므로
+        앞 회차부터 꽉 채운다고 가정한 값보다 작을 수 없습니다.
+        """
+        total, depth, capacity = 0, 1, 1
+        while n > 0:
+            take = min(n, capacity)
+            total += take * depth
+            n -= take
+            depth += 1
+            capacity = self.branching ** (depth - 1)
+        return total
+
+    # --- 대칭 정규화 ---
+
+    def canonical_key(self, candidates) -> tuple:
+        """
+        자리 순열마다 숫자를 '자리별 등장 횟수' 순으로 다시 매겨 정규화하고, 그중 가장 작은 것을 키로 씁니다.
+        동점인 숫자는 원래 숫자 순서로 정하므로 완전한 정규형은 아니지만,
+        같은 키라면 반드시 대칭인 집합이므로(건전함) 테이블을 공유해도 안전합니다.
+        """
+        symbols = [self.symbols[i] for i in candidates]
+        best = None
+        for perm in self.position_perms:
+            permuted = [tuple(sym[p] for p in perm) for sym in symbols]
+
+            # 숫자별 서명: 각 자리에 몇 번 등장하는지
+            signature = collections.defaultdict(lambda: [0] * self.level)
+            for sym in permuted:
+                for pos, d in enumerate(sym):
+                    signature[d][pos] += 1
+            order = sorted(signature, key=lambda d: (signature[d], -d), reverse=True)
+            relabel = {d: new for new, d in enumerate(order)}
+
+            key = tuple(sorted(
+                sum(relabel[d] * self.base ** (self.level - 1 - pos) for pos, d in enumerate(sym))
+                for sym in permuted
+            ))
+            if best is None or key < best:
+                best = key
+        return best
+
+    # --- 탐색 ---
+
+    def _partition(self, guess, candidates):
+        """추측 하나로 후보를 (S, B) 코드별로 나눕니다."""
+        pg, dg = self.pos_masks[guess], self.digit_masks[guess]
+        pos_masks, digit_masks = self.pos_masks, self.digit_masks
+        buckets = collections.defaultdict(list)
+        for c in candidates:
+            buckets[((pg & pos_masks[c]).bit_count() << 4) | (dg & digit_masks[c]).bit_count()].append(c)
+        return buckets
+
+    def _ordered_moves(self, candidates, guess_pool):
+        """
+        후보를 실제로 나누는 추측들을 (하한 합, 추측, 정답이 아닌 그룹 리스트)로 만들어 하한 순으로 정렬합니다.
+        완전히 같은 분할을 만드는 추측은 하나만 남깁니다.
+        """
+        n = len(candidates)
+        candidate_set = set(candidates)
+        moves = []
+        seen = set()
+        for guess in guess_pool:
+            buckets = self._partition(guess, candidates)
+            groups = [tuple(bucket) for code, bucket in buckets.items() if code != self.win_code]
+            if len(groups) == 1 and len(groups[0]) == n:
+                continue  # 아무 정보도 주지 않는 추측
+
+            signature = frozenset(groups)
+            if signature in seen:
+                continue
+            seen.add(signature)
+
+            # 큰 그룹부터 풀어야 가지치기가 빨리 일어납니다.
+            groups.sort(key=len, reverse=True)
+            bound = n + sum(self.lower_bound(len(g)) for g in groups)
+            # 같은 하한이면 후보 안의 추측(바로 맞힐 수도 있음)을 먼저 시도합니다.
+            moves.append((bound, guess not in candidate_set, guess, groups))
+
+        moves.sort(key=lambda m: (m[0], m[1]))
+        return moves
+
+    def _search(self, candidates, beta):
+        """
+        후보 집합의 최적 비용 T(C)를 구합니다.
+        결과가 beta 미만이면 정확한 값, 아니면 'beta 이상'이라는 하한을 반환합니다. (fail-high)
+        """
+        n = len(candidates)
+        if n == 1:
+            return 1, self.numbers[candidates[0]]
+        if n == 2:
+            return 3, self.numbers[candidates[0]]
+
+        lower = self.lower_bound(n)
+        if lower >= beta:
+            return lower, None
+
+        key = self.canonical_key(candidates)
+        entry = self.table.get(key)
+        if entry is not None:
+            value, is_exact = entry
+            if is_exact or value >= beta:
+                return value, None
+            lower = max(lower, value)
+
+        self.nodes += 1
+        if self.candidate_guesses_only:
+            guess_pool = candidates
+        elif n == len(self.numbers):
+            # 전체 집합은 대칭이므로 어떤 추측이든 결과가 같습니다.
+            guess_pool = [0]
+        else:
+            guess_pool = range(len(self.numbers))
+
+        best_value, best_guess = beta, None
+        for bound, _, guess, groups in self._ordered_moves(candidates, guess_pool):
+            if bound >= best_value:
+                break  # 정렬되어 있으므로 이후 추측은 모두 가망이 없습니다.
+
+            cost = n
+            remaining_lower = bound - n
+            for group in groups:
+                remaining_lower -= self.lower_bound(len(group))
+                value, _ = self._search(group, best_value - cost - remaining_lower)
+                cost += value
+                if cost + remaining_lower >= best_value:
+                    break
+            else:
+                best_value, best_guess = cost, self.numbers[guess]
+
+        if best_guess is not None:
+            self.table.put(key, best_value, True)
+            return best_value, best_guess
+
+        # 모든 추측이 beta 이상: 'beta 이상'이라는 사실만 기록해 둡니다.
+        self.table.put(key, max(lower, beta), False)
+        return max(lower, beta), None
+
+    def solve(self, candidates=None):
+        """
+        후보 리스트(문자열)에 대한 최적 전략의 (추측 횟수 합, 첫 추측)을 반환합니다.
+        candidates를 생략하면 전체 집합(게임 시작 상태)을 풉니다.
+        """
+        if candidates is None:
+            indices = list(range(len(self.numbers)))
+        else:
+            indices = sorted(self.index_of[c] for c in candidates)
+        return self._search(indices, float("inf"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="평균 추측 횟수를 최소화하는 최적 전략 탐색")
+    parser.add_argument("--level", type=int, default=3, help="자릿수 (3 또는 4 권장)")
+    parser.add_argument("--table-mb", type=int, default=1024, help="트랜스포지션 테이블 메모리 상한 (MB)")
+    parser.add_argument("--candidate-guesses-only", action="store_true",
+                        help="추측을 남은 후보 안에서만 고릅니다. (더 빠르지만 최적이 아닐 수 있음)")
+    parser.add_argument("--digits", default=None,
+                        help="기호 집합: game.ALPHABETS 이름(decimal, hex) 또는 기호 문자열 (기본: 0~9)")
+    args = parser.parse_args()
+
+    digits = ALPHABETS.get(args.digits, args.digits)
+    solver = ExpectedGuessSolver(args.level, args.table_mb, args.candidate_guesses_only, digits)
+    started = time.time()
+    total, first_guess = solver.solve()
+    n = len(solver.numbers)
+
+    print(f"{args.level}자리: 추측 횟수 합 {total} / {n}개 = 평균 {total / n:.4f}회 (첫 추측: {first_guess})")
+    print(f"탐색 노드: {solver.nodes}, 테이블: {len(solver.table)}개 "
+          f"(적중 {solver.table.hits}, 제거 {solver.table.evictions}), {time.time() - started:.1f}초")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+비트셋 기반 고속 분할 엔진
+
+임의의 추측 하나로 살아 있는 후보 집합을 (S, B) 결과별로 나눕니다.
+후보 하나씩 check_sb를 부르는 대신, 파이썬 큰 정수를 비트 벡터로 써서 집합 전체를 한 번에 계산합니다.
+
+- at[pos][d]  : pos번째 자리가 기호 d인 숫자들의 비트맵
+- has[d]      : 기호 d를 포함하는 숫자들의 비트맵
+추측 g에 대해 '자리 i가 g[i]와 같다' k개 사건 중 정확히 s개가 참인 집합(S_s)과
+'g[i]를 포함한다' k개 사건 중 정확히 c개가 참인 집합(C_c)을 비트 연산으로 구하면
+(S, B) 그룹 = alive & S_s & C_(s+b) 입니다.
+연산 횟수는 후보 수가 아니라 O(k^2)번의 비트맵 AND/OR이라, 7자리(604,800개)에서도 수 ms 안에 끝납니다.
+
+비트맵의 i번째 비트는 backends.level_tables(...).numbers[i]에 대응합니다. (state.GameState.alive와 같은 규칙)
+"""
+
+import itertools
+import math
+
+
+class BitsetIndex:
+    """레벨별 (자리, 기호) / 기호 포함 비트맵. 프로세스당 레벨별로 한 번만 만듭니다."""
+
+    def __init__(self, digits: str, level: int):
+        self.digits = digits
+        self.level = level
+        self.size = math.perm(len(digits), level)
+        self.full = (1 << self.size) - 1
+
+        # 바이트 배열에 비트를 찍은 뒤 한 번에 정수로 바꿉니다. (정수에 직접 |= 하면 매번 복사가 일어남)
+        byte_count = (self.size + 7) // 8
+        at = [[bytearray(byte_count) for _ in digits] for _ in range(level)]
+        has = [bytearray(byte_count) for _ in digits]
+        symbol_of = {ch: i for i, ch in enumerate(digits)}
+
+        # level_tables(...).numbers와 같은 순서로 돌지만, 큰 레벨 테이블(숫자당 약 200바이트) 없이 만듭니다.
+        for i, number in enumerate(itertools.permutations(digits, level)):
+            byte, bit = i >> 3, 1 << (i & 7)
+            for pos, ch in enumerate(number):
+                d = symbol_of[ch]
+                at[pos][d][byte] |= bit
+                has[d][byte] |= bit
+
+        self.symbol_of = symbol_of
+        self.at = [[int.from_bytes(b, "little") for b in row] for row in at]
+        self.has = [int.from_bytes(b, "little") for b in has]
+
+
+_indexes = {}
+
+
+def bitset_index(digits: str, level: int) -> BitsetIndex:
+    index = _indexes.get((digits, level))
+    if index is None:
+        index = _indexes[(digits, level)] = BitsetIndex(digits, level)
+    return index
+
+
+def index_built(digits: str, level: int) -> bool:
+    """이 프로세스에서 해당 레벨의 비트셋 색인을 이미 만들었는지 (메모리 예산 계산용)"""
+    return (digits, level) in _indexes
+
+
+def built_indexes() -> list[tuple[str, int]]:
+    """지금 들고 있는 비트셋 색인의 (기호 집합, 레벨) 목록"""
+    return list(_indexes)
+
+
+def release_index(digits: str, level: int):
+    """비트셋 색인을 놓습니다. (메모리 예산이 모자랄 때, 그 레벨을 쓰는 게임이 없을 때만 부름)"""
+    _indexes.pop((digits, level), None)
+
+
+def _exactly(base: int, events) -> list[int]:
+    """
+    base 안에서 주어진 사건들 중 '정확히 m개'가 참인 원소들의 비트맵 [E_0, E_1, ..., E_k]
+    사건을 하나씩 추가하며 E_m = (E_m & ~ev) | (E_(m-1) & ev) 로 갱신합니다.
+    """
+    counts = [base]
+    for ev in events:
+        counts.append(counts[-1] & ev)
+        for m in range(len(counts) - 2, 0, -1):
+            counts[m] = (counts[m] & ~ev) | (counts[m - 1] & ev)
+        counts[0] &= ~ev
+    return counts
+
+
+def partition_bitmap(digits: str, level: int, alive: int, guess: str) -> dict[tuple[int, int], int]:
+    """
+    살아 있는 후보(alive 비트맵)를 guess에 대한 (S, B) 결과별로 나눕니다.
+    결과: {(S, B): 그 결과를 만드는 후보들의 비트맵} (빈 그룹은 제외)
+    """
+    index = bitset_index(digits, level)
+    symbols = [index.symbol_of[ch] for ch in guess]
+
+    strikes = _exactly(alive, [index.at[pos][d] for pos, d in enumerate(symbols)])
+    commons = _exactly(alive, [index.has[d] for d in symbols])
+
+    buckets = {}
+    for s, strike_set in enumerate(strikes):
+        if not strike_set:
+            continue
+        for common in range(s, level + 1):
+            bucket = strike_set & commons[common]
+            if bucket:
+                buckets[(s, common - s)] = bucket
+    return buckets
+
+
+def partition_sizes(digits: str, level: int, alive: int, guess: str) -> dict[tuple[int, int], int]:
+    """partition_bitmap의 그룹 크기만 필요할 때: {(S, B): 후보 수}"""
+    return {sb: bucket.bit_count() for sb, bucket in partition_bitmap(digits, level, alive, guess).items()}
+
+
+# --- 테이블 없이 인덱스 <-> 숫자 변환 (itertools.permutations 순서) ---
+
+def number_at(digits: str, level: int, index: int) -> str:
+    """index번째 숫자 (level_tables(...).numbers[index]와 같음)"""
+    remaining = list(digits)
+    number = []
+    for pos in range(level):
+        block = math.perm(len(remaining) - 1, level - pos - 1)
+        d, index = divmod(index, block)
+        number.append(remaining.pop(d))
+    return "".join(number)
+
+
+def index_of(digits: str, level: int, number: str) -> int:
+    """number의 인덱스 (level_tables(...).index_of[number]와 같음)"""
+    remaining = list(digits)
+    index = 0
+    for pos, ch in enumerate(number):
+        d = remaining.index(ch)
+        index += d * math.perm(len(remaining) - 1, level - pos - 1)
+        remaining.pop(d)
+    return index
+
+
+def sample_indices(bitmap: int, size: int, rng) -> list[int]:
+    """
+    비트맵에서 살아 있는 인덱스 size개를 무작위로 뽑습니다. (size 이하면 전부)
+    살아 있는 비율이 높으면 무작위 위치를 찍어 보고, 낮으면 한 번 훑으며 저수지 표본을 뽑습니다.
+    """
+    count = bitmap.bit_count()
+    if count <= size:
+        return list(AliveCandidates.iter_indices(bitmap))
+
+    universe = bitmap.bit_length()
+    if count * 20 >= universe:
+        data = bitmap.to_bytes((universe + 7) // 8, "little")
+        picked = set()
+        while len(picked) < size:
+            i = rng.randrange(universe)
+            if data[i >> 3] >> (i & 7) & 1:
+                picked.add(i)
+        return sorted(picked)
+
+    reservoir = []
+    for n, i in enumerate(AliveCandidates.iter_indices(bitmap)):
+        if n < size:
+            reservoir.append(i)
+        else:
+            j = rng.randrange(n + 1)
+            if j < size:
+                reservoir[j] = i
+    return sorted(reservoir)
+
+
+class AliveCandidates:
+    """
+    살아 있는 후보 비트맵을 후보 리스트처럼 쓰게 해 주는 읽기 전용 시퀀스 (메모리 절약 모드용)
+    len(), 순회, [0], bool()을 지원하며, 문자열은 순회할 때만 만듭니다.
+    numbers(전체 숫자 튜플)가 없으면 인덱스에서 직접 숫자를 계산합니다.
+    """
+
+    def __init__(self, digits: str, level: int, bitmap: int, numbers=None):
+        self.digits = digits
+        self.level = level
+        self.bitmap = bitmap
+        self.numbers = numbers
+        self._count = bitmap.bit_count()
+
+    def __len__(self):
+        return self._count
+
+    def __bool__(self):
+        return self._count > 0
+
+    def _number(self, index):
+        if self.numbers is not None:
+            return self.numbers[index]
+        return number_at(self.digits, self.level, index)
+
+    def indices(self):
+        return self.iter_indices(self.bitmap)
+
+    @staticmethod
+    def iter_indices(bitmap: int):
+        """오름차순 인덱스를 하나씩 (비트맵을 8KB 단위로 풀어서 큰 리스트를 만들지 않음)"""
+        chunk_bits = 1 << 16
+        for base in range(0, bitmap.bit_length(), chunk_bits):
+            chunk = bitmap >> base & ((1 << chunk_bits) - 1)
+            while chunk:
+                low = chunk & -chunk
+                yield base + low.bit_length() - 1
+                chunk ^= low
+
+    def __iter__(self):
+        return (self._number(i) for i in self.indices())
+
+    def __getitem__(self, position):
+        if position != 0:
+            raise IndexError("AliveCandidates는 [0]만 지원합니다.")
+        if not self.bitmap:
+            raise IndexError("후보가 없습니다.")
+        return self._number((self.bitmap & -self.bitmap).bit_length() - 1)
@@ -0,0 +1,135 @@
+"""
+서버 시작 직후 엔진을 백그라운드에서 미리 데워 두는 모듈
+
+배포 직후 첫 사용자는 레벨 테이블 생성(8자리 수 초), ATTACK용 비트셋 색인, 전략 트리 읽기,
+백엔드 측정과 프로세스 풀 생성 비용을 모두 첫 게임에서 치르게 됩니다.
+start_background()는 이 작업들을 데몬 스레드에서 미리 해 두므로 첫 화면 렌더링을 막지 않습니다.
+(프로세스 풀은 테이블을 만든 뒤에 띄우므로, fork 환경에서는 워커가 테이블을 그대로 물려받습니다)
+
+환경 변수:
+    NBB_PREWARM_LEVELS  미리 준비할 레벨 목록 (예: "3,4,5", 기본 3,4,5 / 빈 값이면 미리 데우지 않음)
+    NBB_PREWARM_POOLS   "0"이면 백엔드 측정/워커 풀은 미리 준비하지 않음
+
+사용법:
+    python prewarm.py --levels 3 4 5 6    # 단계별 소요 시간 출력
+"""
+
+import argparse
+import os
+import threading
+import time
+
+import backends
+from game import NumberBaseballGame
+
+
+DEFAULT_LEVELS = (3, 4, 5)
+
+_status = {"state": "idle", "levels": [], "seconds": {}}
+_thread = None
+_thread_lock = threading.Lock()
+
+
+def configured_levels() -> list[int]:
+    """NBB_PREWARM_LEVELS에 설정된 레벨 목록 (설정이 없으면 DEFAULT_LEVELS)"""
+    value = os.environ.get("NBB_PREWARM_LEVELS")
+    if value is None:
+        return list(DEFAULT_LEVELS)
+    return [int(level) for level in value.replace(",", " ").split()]
+
+
+def warm_level(level: int):
+    """한 레벨에서 게임이 처음 쓰는 것들: 전체 숫자 테이블, ATTACK 비트셋 색인, 전략 트리 파일"""
+    import partition
+    import strategy_tree
+
+    digits = NumberBaseballGame.DIGITS
+    backends.level_tables(digits, level)
+    partition.bitset_index(digits, level)
+    tree_path = strategy_tree.default_tree_path(level)
+    if os.path.exists(tree_path):
+        strategy_tree.load_tree(tree_path)
+
+
+def _warm_worker(digits, levels):
+    # 프로세스 워커 안에서 실행됩니다. (spawn 환경이면 여기서 테이블을 만들고, fork 환경이면 이미 있음)
+    for level in levels:
+        backends.level_tables(digits, level)
+    return os.getpid()
+
+
+def warm_pools(levels):
+    """백엔드 속도를 측정하고, 프로세스 백엔드를 쓸 수 있으면 워커를 모두 띄워 둡니다."""
+    model = backends.calibrate()
+    if model.workers > 1:
+        pool = backends.get_pool("process")
+        futures = [pool.submit(_warm_worker, NumberBaseballGame.DIGITS, levels) for _ in range(model.workers)]
+        for future in futures:
+            future.result()
+        for level in levels:
+            backends.note_worker_tables(NumberBaseballGame.DIGITS, level)
+
+
+def prewarm(levels=None, pools: bool = True) -> dict:
+    """레벨별 준비와 (pools=True면) 워커 풀 준비를 차례로 실행하고 단계별 소요 시간을 돌려줍니다."""
+    levels = configured_levels() if levels is None else list(levels)
+    _status.update(state="running", levels=levels, seconds={})
+
+    for level in levels:
+        started = time.perf_counter()
+        warm_level(level)
+        _status["seconds"][f"level_{level}"] = time.perf_counter() - started
+
+    if pools:
+        started = time.perf_counter()
+        warm_pools(levels)
+        _status["seconds"]["pools"] = time.perf_counter() - started
+
+    _status["state"] = "done"
+    return dict(_status["seconds"])
+
+
+def _run_background(levels, pools):
+    try:
+        prewarm(levels, pools)
+    except Exception as exc:
+        # 미리 데우기는 최적화일 뿐이므로 실패해도 게임은 평소처럼 (첫 사용 때) 준비합니다.
+        _status.update(state="failed", error=f"{type(exc).__name__}: {exc}")
+
+
+def start_background(levels=None, pools: bool = None) -> threading.Thread:
+    """
+    미리 데우기를 데몬 스레드에서 시작하고 바로 돌아옵니다. 프로세스당 한 번만 실행됩니다.
+    레벨 목록이 비어 있으면(NBB_PREWARM_LEVELS="") 아무것도 하지 않습니다.
+    """
+    global _thread
+    levels = configured_levels() if levels is None else list(levels)
+    if pools is None:
+        pools = os.environ.get("NBB_PREWARM_POOLS", "1") != "0"
+
+    with _thread_lock:
+        if _thread is None and levels:
+            _thread = threading.Thread(target=_run_background, args=(levels, pools),
+                                       name="prewarm", daemon=True)
+            _thread.start()
+        return _thread
+
+
+def status() -> dict:
+    """진행 상태: {"state": idle/running/done/failed, "levels": [...], "seconds": {단계: 초}}"""
+    return dict(_status, seconds=dict(_status["seconds"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="숫자야구 엔진 미리 데우기 (단계별 소요 시간 측정)")
+    parser.add_argument("--levels", nargs="+", type=int, default=None, help="레벨 목록 (기본: NBB_PREWARM_LEVELS)")
+    parser.add_argument("--no-pools", action="store_true", help="백엔드 측정/워커 풀 준비 생략")
+    args = parser.parse_args()
+
+    for step, seconds in prewarm(args.levels, pools=not args.no_pools).items():
+        print(f"{step:>10}: {seconds:.2f}s")
+    backends.shutdown_pools()
+
+
+if __name__ == "__main__":
+    main()
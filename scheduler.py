@@ -0,0 +1,175 @@
+"""
+미니맥스 계산 작업 스케줄러 (프로세스 전체 공용)
+
+여러 사용자가 한 서버를 같이 쓰면, 몇 분짜리 6자리 AUTOPLAY 계산이 워커를 모두 차지하는 동안
+몇 ms면 끝날 3자리 DEFENSE 응답이 뒤에서 기다리게 됩니다. 모든 '다음 추측' 계산을 이 스케줄러에 맡겨
+- 동시에 실행되는 작업 수를 전역으로 제한하고 (max_concurrent)
+- 같은 세션이 이미 돌리고 있는 작업이 적을수록, 예상 연산량(|추측| x |후보|)이 작을수록 먼저 실행하며
+- 오래 기다린 작업은 우선순위를 올려(aging) 큰 작업도 언젠가는 실행되도록 합니다.
+대기열 길이와 대기 시간은 metrics()로 확인할 수 있습니다.
+"""
+
+import collections
+import concurrent.futures
+import itertools
+import os
+import threading
+import time
+
+import backends
+
+
+class Job:
+    """스케줄러에 맡긴 작업 하나. future로 결과를 받고, cancel()로 취소합니다."""
+
+    def __init__(self, seq, session_id, cost, fn):
+        self.seq = seq
+        self.session_id = session_id
+        self.cost = cost
+        self.fn = fn
+        self.future = concurrent.futures.Future()
+        self.cancel_event = threading.Event()  # 실행 중인 작업에 전달되는 중단 신호
+        self.submitted_at = time.perf_counter()
+        self.started_at = None
+
+    def cancel(self):
+        self.cancel_event.set()
+        self.future.cancel()
+
+
+class SolverScheduler:
+
+    def __init__(self, max_concurrent: int = None, aging_seconds: float = 2.0):
+        self.max_concurrent = max_concurrent or backends.default_workers()
+        # 대기 시간이 aging_seconds 지날 때마다 예상 연산량을 그만큼 나눠서 봅니다.
+        self.aging_seconds = aging_seconds
+
+        self._lock = threading.Lock()
+        self._queue = []
+        self._running = 0
+        self._session_running = collections.Counter()
+        self._seq = itertools.count()
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_concurrent,
+                                                               thread_name_prefix="solver-job")
+
+        # 지표
+        self._wait_times = collections.deque(maxlen=1000)
+        self._completed = 0
+        self._cancelled = 0
+
+    # --- 제출 ---
+
+    def submit(self, session_id, cost: int, fn) -> Job:
+        """
+        작업을 대기열에 넣습니다. fn(should_stop)은 작업 스레드에서 실행되며,
+        should_stop()이 True가 되면 계산을 멈추고 InterruptedError를 일으켜야 합니다.
+        """
+        job = Job(next(self._seq), session_id, cost, fn)
+        with self._lock:
+            self._queue.append(job)
+            self._dispatch()
+        return job
+
+    def run(self, session_id, cost: int, fn, stop_callback=None):
+        """
+        작업을 제출하고 끝날 때까지 기다립니다. (호출한 스레드에서 stop_callback을 주기적으로 확인)
+        stop_callback은 호출한 스레드에서만 부르므로 Streamlit 세션 상태를 읽는 함수여도 안전합니다.
+        """
+        job = self.submit(session_id, cost, fn)
+        while True:
+            try:
+                return job.future.result(timeout=backends.POLL_INTERVAL)
+            except concurrent.futures.TimeoutError:
+                if stop_callback and stop_callback():
+                    self.cancel(job)
+                    raise InterruptedError("Game Stopped by User")
+
+    def cancel(self, job: Job):
+        with self._lock:
+            if job in self._queue:
+                self._queue.remove(job)
+                self._cancelled += 1
+        job.cancel()
+
+    # --- 실행 ---
+
+    def _priority(self, job, now):
+        waited = now - job.submitted_at
+        effective_cost = job.cost / (1 + waited / self.aging_seconds)
+        return self._session_running[job.session_id], effective_cost, job.seq
+
+    def _dispatch(self):
+        """빈 자리가 있으면 우선순위가 가장 높은 작업부터 실행합니다. (_lock을 잡은 상태에서 호출)"""
+        now = time.perf_counter()
+        while self._queue and self._running < self.max_concurrent:
+            job = min(self._queue, key=lambda j: self._priority(j, now))
+            self._queue.remove(job)
+
+            if not job.future.set_running_or_notify_cancel():
+                self._cancelled += 1
+                continue
+
+            job.started_at = now
+            self._wait_times.append(now - job.submitted_at)
+            self._running += 1
+            self._session_running[job.session_id] += 1
+            self._executor.submit(self._run_job, job)
+
+    def _run_job(self, job: Job):
+        try:
+            result = job.fn(job.cancel_event.is_set)
+        except BaseException as exc:
+            job.future.set_exception(exc)
+        else:
+            job.future.set_result(result)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._session_running[job.session_id] -= 1
+                if not self._session_running[job.session_id]:
+                    del self._session_running[job.session_id]
+                if job.cancel_event.is_set():
+                    self._cancelled += 1
+                else:
+                    self._completed += 1
+                self._dispatch()
+
+    # --- 지표 ---
+
+    def metrics(self) -> dict:
+        with self._lock:
+            waits = sorted(self._wait_times)
+            now = time.perf_counter()
+            oldest = max((now - job.submitted_at for job in self._queue), default=0.0)
+            queued_by_session = collections.Counter(job.session_id for job in self._queue)
+            return {
+                "max_concurrent": self.max_concurrent,
+                "running": self._running,
+                "queue_depth": len(self._queue),
+                "queued_by_session": dict(queued_by_session),
+                "oldest_wait_seconds": oldest,
+                "completed": self._completed,
+                "cancelled": self._cancelled,
+                "wait_p50_seconds": _percentile(waits, 0.50),
+                "wait_p95_seconds": _percentile(waits, 0.95),
+                "wait_max_seconds": waits[-1] if waits else 0.0,
+            }
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> SolverScheduler:
+    """프로세스 공용 스케줄러. 동시 실행 수는 환경 변수 NBB_MAX_CONCURRENT_JOBS로 바꿀 수 있습니다."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = SolverScheduler(int(os.environ.get("NBB_MAX_CONCURRENT_JOBS", 0)) or None)
+        return _scheduler
@@ -0,0 +1,99 @@
+"""
+게임 상태를 작게 담는 스냅샷 객체
+
+NumberBaseballGame은 후보를 문자열 리스트로 들고 있어서 그대로 피클링하면 수 MB가 됩니다.
+여기서는 레벨별 전체 숫자 목록(backends.level_tables)의 인덱스를 기준으로
+- 살아 있는 후보: 비트맵(int) 하나  (5자리 30,240개 -> 약 4KB, 압축 후 더 작음)
+- 추측 기록: 턴마다 정수 하나      (추측 인덱스 << 8 | S << 4 | B)
+만 저장합니다. 워커 전달, 캐시, 세션 저장 모두 이 객체를 쓰면 턴마다 KB 단위만 오갑니다.
+"""
+
+import zlib
+
+
+def indices_to_bitmap(indices) -> int:
+    """인덱스 목록 -> 비트맵 (i번째 비트 = i번 숫자가 살아 있음)"""
+    indices = list(indices)
+    if not indices:
+        return 0
+    buffer = bytearray(max(indices) // 8 + 1)
+    for i in indices:
+        buffer[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buffer, "little")
+
+
+def bitmap_to_indices(bitmap: int) -> list[int]:
+    """비트맵 -> 오름차순 인덱스 목록"""
+    indices = []
+    data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")
+    for byte_index, byte in enumerate(data):
+        if not byte:
+            continue
+        base = byte_index << 3
+        for bit in range(8):
+            if byte >> bit & 1:
+                indices.append(base + bit)
+    return indices
+
+
+def encode_turn(guess_index: int, s: int, b: int) -> int:
+    return guess_index << 8 | s << 4 | b
+
+
+def decode_turn(turn: int) -> tuple[int, int, int]:
+    return turn >> 8, turn >> 4 & 0xF, turn & 0xF
+
+
+class GameState:
+    """
+    레벨, 살아 있는 후보 비트맵, 추측 기록과 app.py가 쓰는 진행 정보만 담은 스냅샷입니다.
+    인덱스가 없는 값(-1)은 '없음'을 뜻합니다.
+    인덱스는 기호 집합(digits)마다 가리키는 숫자가 다르므로 기호 집합도 함께 저장합니다. (None = 기본 0~9)
+    """
+
+    __slots__ = ("level", "alive", "history", "last_guess", "guess_count", "secret_answer", "digits")
+
+    def __init__(self, level, alive=0, history=(), last_guess=-1, guess_count=0, secret_answer=-1, digits=None):
+        self.level = level
+        self.alive = alive                  # 살아 있는 후보 비트맵
+        self.history = tuple(history)       # encode_turn()으로 만든 정수들
+        self.last_guess = last_guess        # 마지막으로 던진 추측의 인덱스
+        self.guess_count = guess_count
+        self.secret_answer = secret_answer  # ATTACK 모드 정답의 인덱스
+        self.digits = digits                # 인덱스의 기준 기호 집합
+
+    @property
+    def alive_count(self) -> int:
+        return self.alive.bit_count()
+
+    def turns(self) -> list[tuple[int, int, int]]:
+        """[(추측 인덱스, S, B), ...]"""
+        return [decode_turn(turn) for turn in self.history]
+
+    # --- 직렬화 ---
+    # 비트맵은 zlib으로 압축해 바이트로 저장합니다. (후보가 줄어들수록 0이 많아져 잘 압축됨)
+
+    def __getstate__(self):
+        alive_bytes = self.alive.to_bytes((self.alive.bit_length() + 7) // 8, "little")
+        return (self.level, zlib.compress(alive_bytes), self.history,
+                self.last_guess, self.guess_count, self.secret_answer, self.digits)
+
+    def __setstate__(self, data):
+        # 기호 집합이 없던 예전 스냅샷(6개 항목)은 기본 기호 집합으로 읽습니다.
+        level, alive_bytes, history, last_guess, guess_count, secret_answer, *rest = data
+        self.digits = rest[0] if rest else None
+        self.level = level
+        self.alive = int.from_bytes(zlib.decompress(alive_bytes), "little")
+        self.history = history
+        self.last_guess = last_guess
+        self.guess_count = guess_count
+        self.secret_answer = secret_answer
+
+    def __eq__(self, other):
+        if not isinstance(other, GameState):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return (f"GameState(level={self.level}, alive={self.alive_count}, "
+                f"turns={len(self.history)}, guess_count={self.guess_count})")
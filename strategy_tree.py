@@ -0,0 +1,252 @@
+"""
+미니맥스 전략 트리 오프라인 빌더
+
+하드코딩된 첫 추측(DIGITS[:scale])에서 시작해 모든 (S, B) 결과 가지를 따라가며
+전체 결정 트리를 미리 계산해 둡니다. 게임 엔진은 이 트리를 불러와 매 턴 O(1)로 추측을 꺼냅니다.
+
+사용법:
+    python strategy_tree.py build --level 4 --out trees/tree_4.json
+    python strategy_tree.py build --level 5 --out trees/tree_5.json --workers 8   # 중단 후 같은 명령으로 재개
+    python strategy_tree.py build --level 4 --digits hex     # 16진수 트리 -> trees/tree_4_1234567890ABCDEF.json
+    python strategy_tree.py build --level 6 --coordinator host:50000 --authkey secret   # 여러 머신에 나눠 계산 (distributed.py)
+    python strategy_tree.py stats trees/tree_4.json
+
+트리 형식 (JSON):
+    {"level": 4, "digits": "1234567890", "nodes": {"": "1234", "02": "5678", "0213": ...}, "stats": {...}}
+    - 키(path)는 루트부터 받은 결과를 "SB" 두 글자씩 이어붙인 문자열입니다. (예: 0S 2B -> 1S 3B => "0213")
+    - 값은 그 상태에서 던질 추측입니다.
+"""
+
+import argparse
+import collections
+import contextlib
+import functools
+import json
+import multiprocessing
+import os
+import time
+
+import backends
+from game import ALPHABETS, NumberBaseballGame
+
+
+DEFAULT_TREE_DIR = "trees"
+
+
+def default_tree_path(level: int, digits: str = None) -> str:
+    """레벨별 기본 트리 파일 경로 (기본 기호 집합이 아니면 파일 이름에 기호 집합을 붙임)"""
+    if digits is None or digits == NumberBaseballGame.DIGITS:
+        return os.path.join(DEFAULT_TREE_DIR, f"tree_{level}.json")
+    return os.path.join(DEFAULT_TREE_DIR, f"tree_{level}_{digits}.json")
+
+
+@functools.lru_cache(maxsize=None)
+def load_tree(path: str) -> dict:
+    """트리 파일을 읽어옵니다. 여러 게임이 같은 파일을 쓰므로 프로세스당 한 번만 읽습니다."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+# --- 워커 프로세스 ---
+
+def _init_worker(digits: str, level: int):
+    # 워커마다 레벨 테이블을 한 번만 만들어 둡니다. (매 작업마다 피클링하지 않기 위함)
+    backends.level_tables(digits, level)
+
+
+def _build_node(digits, job):
+    """노드 하나(path, 후보 리스트)의 최적 추측을 계산합니다. 워커 하나가 노드 하나를 맡으므로 vector 커널을 씁니다."""
+    path, level, candidates = job
+    guess, _ = backends.find_best_guess(digits, level, candidates, backend="vector")
+    return path, guess
+
+
+# --- 체크포인트 ---
+
+def _load_checkpoint(checkpoint_path: str, level: int, digits: str = NumberBaseballGame.DIGITS) -> dict:
+    """체크포인트(JSON lines)에서 이미 계산된 노드들을 읽어옵니다."""
+    done = {}
+    if not os.path.exists(checkpoint_path):
+        return done
+
+    valid_size = 0
+    with open(checkpoint_path, "rb") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # 중단 시점에 쓰다 만 마지막 줄입니다. 여기서부터 잘라냅니다.
+                break
+            if not line.endswith(b"\n"):
+                break
+            if record.get("level", level) != level:
+                raise ValueError(f"체크포인트 레벨 불일치: {checkpoint_path}")
+            if record.get("digits", NumberBaseballGame.DIGITS) != digits:
+                raise ValueError(f"체크포인트 기호 집합 불일치: {checkpoint_path}")
+            done[record["path"]] = record["guess"]
+            valid_size += len(line)
+
+    # 잘린 줄 뒤에 새 기록이 이어 붙지 않도록 파일을 정리합니다.
+    with open(checkpoint_path, "r+b") as f:
+        f.truncate(valid_size)
+    return done
+
+
+# --- 빌더 ---
+
+def build_tree(level: int, checkpoint_path: str, workers: int = None, log=print, search=None,
+               digits: str = None) -> dict:
+    """
+    전체 전략 트리를 깊이 순서(BFS)로 계산합니다.
+    계산이 필요한 노드는 프로세스 풀에 나눠 맡기고, 끝나는 즉시 체크포인트에 기록합니다.
+    search(distributed.DistributedSearch)를 주면 로컬 풀 대신 코디네이터의 워커들에게 맡깁니다. (결과는 같음)
+    digits를 주면 그 기호 집합의 트리를 만듭니다. (기본: 0~9)
+    """
+    workers = workers or os.cpu_count() or 1
+    game = NumberBaseballGame(n=level, digits=digits)
+    game.generate_all_candidates()
+    digits = game.DIGITS
+
+    done = _load_checkpoint(checkpoint_path, level, digits)
+    if done:
+        log(f"체크포인트에서 {len(done)}개 노드를 불러왔습니다.")
+
+    nodes = {}
+    depth_counts = collections.Counter()  # {정답을 맞히는 회차: 정답 수}
+    frontier = [("", game.candidates)]
+    depth = 0
+    started = time.time()
+
+    local_pool = (multiprocessing.Pool(workers, initializer=_init_worker, initargs=(digits, level))
+                  if search is None else contextlib.nullcontext())
+    with open(checkpoint_path, "a", encoding="utf-8") as ckpt, local_pool as pool:
+        if search is not None:
+            solve_nodes = functools.partial(search.imap_nodes, digits=digits)
+        else:
+            solve_nodes = functools.partial(pool.imap_unordered, functools.partial(_build_node, digits))
+
+        while frontier:
+            depth += 1
+            if depth > 10:  # 안전장치 (play_game과 동일)
+                raise RuntimeError("트리 깊이가 10을 넘었습니다.")
+
+            # 1. 이 깊이의 노드 중 아직 계산되지 않은 것만 풀에 맡깁니다.
+            jobs = []
+            for path, candidates in frontier:
+                if path == "":
+                    nodes[path] = game.DIGITS[:level]
+                elif len(candidates) <= 2:
+                    nodes[path] = candidates[0]
+                elif path in done:
+                    nodes[path] = done[path]
+                else:
+                    jobs.append((path, level, candidates))
+
+            # 큰 노드부터 맡겨야 마지막에 한 워커만 일하는 상황이 줄어듭니다.
+            jobs.sort(key=lambda job: len(job[2]), reverse=True)
+            log(f"[깊이 {depth}] 노드 {len(frontier)}개 (계산 필요: {len(jobs)}개)")
+
+            for i, (path, guess) in enumerate(solve_nodes(jobs), start=1):
+                nodes[path] = guess
+                ckpt.write(json.dumps({"level": level, "digits": digits, "path": path, "guess": guess}) + "\n")
+                ckpt.flush()
+                if i % 100 == 0 or i == len(jobs):
+                    log(f"  {i}/{len(jobs)} 완료 ({time.time() - started:.1f}초)")
+
+            # 2. 각 노드를 (S, B) 결과별로 나눠 다음 깊이의 노드를 만듭니다.
+            next_frontier = []
+            for path, candidates in frontier:
+                guess = nodes[path]
+                buckets = collections.defaultdict(list)
+                for candidate in candidates:
+                    buckets[game.check_sb(guess, candidate)].append(candidate)
+
+                for (s, b), bucket in buckets.items():
+                    if s == level:
+                        depth_counts[depth] += 1
+                        continue
+                    if len(bucket) == len(candidates):
+                        raise RuntimeError(f"추측 {guess}가 후보를 나누지 못했습니다. (path={path!r})")
+                    next_frontier.append((path + f"{s}{b}", bucket))
+
+            frontier = next_frontier
+
+    total = sum(depth_counts.values())
+    stats = {
+        "node_count": len(nodes),
+        "secret_count": total,
+        "max_depth": max(depth_counts),
+        "avg_depth": sum(d * c for d, c in depth_counts.items()) / total,
+        "depth_histogram": {str(d): depth_counts[d] for d in sorted(depth_counts)},
+        "build_seconds": round(time.time() - started, 2),
+    }
+    return {"level": level, "digits": game.DIGITS, "nodes": nodes, "stats": stats}
+
+
+def save_tree(tree: dict, path: str):
+    """공백 없는 JSON으로 저장합니다. (임시 파일에 쓴 뒤 교체하므로 중간에 끊겨도 기존 파일은 안전)"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(tree, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def _print_stats(stats: dict):
+    print(f"노드 수: {stats['node_count']}")
+    print(f"정답 수: {stats['secret_count']}")
+    print(f"최대 깊이: {stats['max_depth']}회")
+    print(f"평균 깊이: {stats['avg_depth']:.4f}회")
+    print(f"깊이 분포: {stats['depth_histogram']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="숫자야구 미니맥스 전략 트리 빌더")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_build = sub.add_parser("build", help="전략 트리 생성 (체크포인트가 있으면 이어서 진행)")
+    p_build.add_argument("--level", type=int, required=True, help="자릿수 (3~9)")
+    p_build.add_argument("--out", help="출력 파일 (기본: trees/tree_<level>.json)")
+    p_build.add_argument("--checkpoint", help="체크포인트 파일 (기본: <out>.ckpt)")
+    p_build.add_argument("--workers", type=int, default=None, help="워커 프로세스 수 (기본: 코어 수)")
+    p_build.add_argument("--digits", default=None,
+                         help="기호 집합: game.ALPHABETS 이름(decimal, hex) 또는 기호 문자열 (기본: 0~9)")
+    p_build.add_argument("--coordinator", help="distributed.py 코디네이터 주소:포트 (주면 로컬 풀 대신 원격 워커 사용)")
+    p_build.add_argument("--authkey", default=None, help="코디네이터 인증 키 (--coordinator에 필수, 생략하면 NBB_AUTHKEY)")
+
+    p_stats = sub.add_parser("stats", help="저장된 트리의 통계 출력")
+    p_stats.add_argument("path")
+
+    args = parser.parse_args()
+
+    if args.command == "build" and args.coordinator:
+        import distributed
+        try:
+            args.authkey = distributed.resolve_authkey(args.authkey)
+        except ValueError as exc:
+            parser.error(str(exc))
+
+    if args.command == "build":
+        digits = ALPHABETS.get(args.digits, args.digits) or NumberBaseballGame.DIGITS
+        out = args.out or default_tree_path(args.level, digits)
+        checkpoint = args.checkpoint or out + ".ckpt"
+        os.makedirs(os.path.dirname(checkpoint) or ".", exist_ok=True)
+
+        search = None
+        if args.coordinator:
+            import distributed
+            search = distributed.DistributedSearch(distributed.parse_address(args.coordinator),
+                                                   args.authkey)
+        tree = build_tree(args.level, checkpoint, workers=args.workers, search=search, digits=digits)
+        save_tree(tree, out)
+        # 완성된 트리를 저장했으므로 체크포인트는 더 이상 필요 없습니다.
+        os.remove(checkpoint)
+        print(f"저장 완료: {out}")
+        _print_stats(tree["stats"])
+
+    elif args.command == "stats":
+        _print_stats(load_tree(args.path)["stats"])
+
+
+if __name__ == "__main__":
+    main()